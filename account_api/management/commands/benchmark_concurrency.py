@@ -0,0 +1,204 @@
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from account_api.models import Account
+from account_api.services import AccountService
+from transfer_api.services import TransferService
+from shared.locks import AccountLocks
+from shared.models import IdempotencyKey, OutboxMessage
+from shared.utils import MovementTypes, PasswordHasher, CPFValidator
+from shared.exceptions import BankMoreException, ErrorTypes
+
+
+class Command(BaseCommand):
+    help = 'Hammer a few accounts with concurrent debits and transfers and check that none of them is overdrawn'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--accounts',
+            type=int,
+            default=10,
+            help='Number of benchmark accounts; fewer accounts means more contention'
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=16,
+            help='Concurrent workers issuing debits'
+        )
+        parser.add_argument(
+            '--operations',
+            type=int,
+            default=2000,
+            help='Total number of debits and transfers attempted'
+        )
+        parser.add_argument(
+            '--transfer-ratio',
+            type=float,
+            default=0.5,
+            help='Share of the operations that are transfers between benchmark accounts instead of plain debits'
+        )
+        parser.add_argument(
+            '--initial-balance',
+            type=Decimal,
+            default=Decimal('1000'),
+            help='Balance credited to each account before the run'
+        )
+        parser.add_argument(
+            '--amount',
+            type=Decimal,
+            default=Decimal('10'),
+            help='Value of each debit or transfer'
+        )
+        parser.add_argument(
+            '--lock-backend',
+            choices=['auto', 'database', 'redis', 'local'],
+            help='Override ACCOUNT_LOCK_SETTINGS BACKEND for this run'
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Keep the benchmark accounts and movements after the run'
+        )
+
+    def handle(self, *args, **options):
+        if options['accounts'] < 2 and options['transfer_ratio'] > 0:
+            raise CommandError('Transfers need at least two accounts')
+        
+        lock_settings = dict(settings.ACCOUNT_LOCK_SETTINGS)
+        if options['lock_backend']:
+            lock_settings['BACKEND'] = options['lock_backend']
+        
+        # only this run sees the overridden backend; settings are restored when it ends
+        with override_settings(ACCOUNT_LOCK_SETTINGS=lock_settings):
+            self._benchmark(options)
+
+    def _benchmark(self, options):
+        run_id = uuid.uuid4().hex[:8]
+        accounts = []
+        try:
+            accounts = self._create_accounts(run_id, options['accounts'], options['initial_balance'])
+            self._hammer(run_id, accounts, options)
+        finally:
+            if not options['keep']:
+                self._cleanup(run_id, accounts)
+
+    def _hammer(self, run_id: str, accounts: list, options):
+        self.counts = {'applied': 0, 'rejected': 0, 'busy': 0, 'errors': 0}
+        self.deltas = {account.number: Decimal('0') for account in accounts}
+        self.counts_lock = threading.Lock()
+        
+        by_number = {account.number: account for account in accounts}
+        numbers = list(by_number)
+        operations = []
+        for index in range(options['operations']):
+            if len(numbers) > 1 and random.random() < options['transfer_ratio']:
+                origin, destination = random.sample(numbers, 2)
+            else:
+                origin, destination = random.choice(numbers), None
+            operations.append((f'bench-{run_id}-{index}', by_number[origin], destination))
+        slices = [operations[index::options['threads']] for index in range(options['threads'])]
+        
+        self.stdout.write(
+            f"Running {options['operations']} debits and transfers of {options['amount']} over {options['accounts']} accounts "
+            f"with {options['threads']} threads (lock backend: {AccountLocks.backend()})"
+        )
+        
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options['threads']) as executor:
+            list(executor.map(lambda chunk: self._run(chunk, options['amount']), slices))
+        elapsed = time.monotonic() - started
+        
+        overdrawn, mismatched = self._verify(accounts, options['initial_balance'])
+        
+        self.stdout.write(
+            f"{self.counts['applied']} applied, {self.counts['rejected']} rejected for balance or limits, "
+            f"{self.counts['busy']} lock timeouts, {self.counts['errors']} errors"
+        )
+        self.stdout.write(
+            f"{elapsed:.2f}s, {options['operations'] / elapsed:.0f} operations/s, "
+            f"{self.counts['applied'] / elapsed:.0f} applied/s"
+        )
+        
+        if overdrawn or mismatched:
+            raise CommandError(f'{overdrawn} accounts overdrawn, {mismatched} balances not matching their movements')
+        
+        self.stdout.write(self.style.SUCCESS('No account was overdrawn'))
+
+    def _cleanup(self, run_id: str, accounts: list):
+        # transfers, movements and rollups go with the accounts; pending outbox events must not reach Kafka
+        OutboxMessage.objects.filter(published_at__isnull=True, payload__contains=f'"bench-{run_id}-').delete()
+        Account.objects.filter(pk__in=[account.pk for account in accounts]).delete()
+        IdempotencyKey.objects.filter(key__startswith=f'bench-{run_id}-').delete()
+
+    def _create_accounts(self, run_id: str, count: int, initial_balance: Decimal) -> list:
+        salt = PasswordHasher.generate_salt()
+        password_hash = PasswordHasher.hash_password(run_id, salt)
+        
+        accounts = []
+        for index in range(count):
+            account = Account.objects.create(
+                cpf=self._free_cpf(),
+                name=f'Benchmark {run_id} {index}',
+                salt=salt,
+                password_hash=password_hash
+            )
+            AccountService.create_movement(f'bench-{run_id}-fund-{index}', account.number, initial_balance, MovementTypes.CREDIT)
+            accounts.append(account)
+        
+        return accounts
+
+    def _free_cpf(self) -> str:
+        # valid check digits, and never one that a real customer already uses
+        while True:
+            cpf = f'{random.randrange(10 ** 11):011d}'
+            if CPFValidator.validate(cpf) and not Account.objects.filter(cpf=cpf).exists():
+                return cpf
+
+    def _run(self, operations: list, amount: Decimal):
+        try:
+            for request_id, origin, destination_number in operations:
+                try:
+                    if destination_number:
+                        TransferService.create_transfer(request_id, str(origin.pk), destination_number, amount)
+                    else:
+                        AccountService.create_movement(request_id, origin.number, amount, MovementTypes.DEBIT)
+                    outcome = 'applied'
+                except BankMoreException as e:
+                    if e.error_type in (ErrorTypes.INSUFFICIENT_BALANCE, ErrorTypes.TRANSFER_LIMIT_EXCEEDED):
+                        outcome = 'rejected'
+                    elif e.error_type == ErrorTypes.ACCOUNT_BUSY:
+                        outcome = 'busy'
+                    else:
+                        outcome = 'errors'
+                except Exception:
+                    outcome = 'errors'
+                
+                with self.counts_lock:
+                    self.counts[outcome] += 1
+                    if outcome == 'applied':
+                        self.deltas[origin.number] -= amount
+                        if destination_number:
+                            self.deltas[destination_number] += amount
+        finally:
+            connection.close()
+
+    def _verify(self, accounts: list, initial_balance: Decimal) -> tuple:
+        overdrawn = 0
+        mismatched = 0
+        
+        for account in Account.objects.filter(pk__in=[account.pk for account in accounts]):
+            expected = initial_balance + self.deltas[account.number]
+            if account.balance < 0:
+                overdrawn += 1
+            if account.balance != account.get_ledger_balance() or account.balance != expected:
+                mismatched += 1
+        
+        return overdrawn, mismatched
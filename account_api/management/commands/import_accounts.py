@@ -0,0 +1,180 @@
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+from account_api.models import Account, account_number_allocator
+from account_api.services import account_number_filter
+from shared.utils import AccountNumberGenerator, BatchUtils, CPFValidator, PasswordHasher
+
+
+def prepare_row(row: dict) -> dict:
+    cpf = CPFValidator.clean(row.get('cpf') or '')
+    name = (row.get('name') or '').strip()
+    password = row.get('password') or ''
+    
+    prepared = {'line': row['line'], 'cpf': cpf, 'name': name, 'error': None}
+    
+    if not CPFValidator.validate(cpf):
+        prepared['error'] = 'CPF inválido'
+    elif len(name) < 2 or len(name) > 100:
+        prepared['error'] = 'Nome deve ter entre 2 e 100 caracteres'
+    elif len(password) < 6:
+        prepared['error'] = 'Senha deve ter pelo menos 6 caracteres'
+    else:
+        prepared['salt'] = PasswordHasher.generate_salt()
+        prepared['password_hash'] = PasswordHasher.hash_password(password, prepared['salt'])
+    
+    return prepared
+
+
+class Command(BaseCommand):
+    help = 'Import accounts from a CSV file with cpf,name,password columns'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', help='CSV file with a cpf,name,password header')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Rows validated, checked and inserted per batch'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Processes used to validate CPFs and hash passwords'
+        )
+        parser.add_argument(
+            '--rejects',
+            help='Where to write rejected rows (defaults to <csv_path>.rejects.csv)'
+        )
+
+    def handle(self, *args, **options):
+        csv_path = options['csv_path']
+        chunk_size = options['chunk_size']
+        rejects_path = options['rejects'] or f'{csv_path}.rejects.csv'
+        
+        if not os.path.exists(csv_path):
+            raise CommandError(f'File not found: {csv_path}')
+        
+        self.seen_cpfs = set()
+        self.imported = 0
+        self.rejected = 0
+        started = time.monotonic()
+        
+        executor = ProcessPoolExecutor(max_workers=options['workers']) if options['workers'] > 1 else None
+        
+        try:
+            with open(csv_path, newline='', encoding='utf-8') as source, \
+                    open(rejects_path, 'w', newline='', encoding='utf-8') as rejects_file:
+                rejects = csv.writer(rejects_file)
+                rejects.writerow(['line', 'cpf', 'name', 'reason'])
+                
+                reader = csv.DictReader(source)
+                rows = ({**row, 'line': line} for line, row in enumerate(reader, start=2))
+                
+                for chunk in BatchUtils.chunked(rows, chunk_size):
+                    if executor:
+                        prepared = list(executor.map(prepare_row, chunk, chunksize=max(1, chunk_size // (options['workers'] * 4))))
+                    else:
+                        prepared = [prepare_row(row) for row in chunk]
+                    
+                    self._import_chunk(prepared, rejects)
+                    
+                    elapsed = time.monotonic() - started
+                    self.stdout.write(
+                        f'{self.imported} imported, {self.rejected} rejected '
+                        f'({(self.imported + self.rejected) / elapsed:.0f} rows/s)'
+                    )
+        finally:
+            if executor:
+                executor.shutdown()
+        
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Imported {self.imported} accounts in {elapsed:.1f}s '
+                f'({self.imported / elapsed if elapsed else 0:.0f} accounts/s)'
+            )
+        )
+        if self.rejected:
+            self.stdout.write(self.style.WARNING(f'{self.rejected} rows rejected, see {rejects_path}'))
+
+    def _import_chunk(self, prepared: list, rejects):
+        candidates = []
+        for row in prepared:
+            if row['error'] is None and row['cpf'] in self.seen_cpfs:
+                row['error'] = 'CPF duplicado no arquivo'
+            
+            if row['error']:
+                self._reject(rejects, row)
+                continue
+            
+            self.seen_cpfs.add(row['cpf'])
+            candidates.append(row)
+        
+        existing = set(
+            Account.objects.filter(cpf__in=[row['cpf'] for row in candidates]).values_list('cpf', flat=True)
+        )
+        
+        accounts = []
+        for row in candidates:
+            if row['cpf'] in existing:
+                row['error'] = 'CPF já cadastrado'
+                self._reject(rejects, row)
+                continue
+            
+            accounts.append(Account(
+                number=AccountNumberGenerator.format(account_number_allocator.allocate()),
+                cpf=row['cpf'],
+                name=row['name'],
+                password_hash=row['password_hash'],
+                salt=row['salt']
+            ))
+        
+        imported = self.imported
+        try:
+            with transaction.atomic():
+                Account.objects.bulk_create(accounts)
+            self.imported += len(accounts)
+        except IntegrityError:
+            self._import_one_by_one(accounts, candidates, rejects)
+        
+        # published per committed chunk, so other workers see new accounts while a long import is still running
+        if self.imported > imported:
+            account_number_filter.notify_changed()
+
+    def _import_one_by_one(self, accounts: list, candidates: list, rejects):
+        rows_by_cpf = {row['cpf']: row for row in candidates}
+        
+        for account in accounts:
+            error = self._insert(account)
+            if error:
+                row = rows_by_cpf[account.cpf]
+                row['error'] = error
+                self._reject(rejects, row)
+            else:
+                self.imported += 1
+
+    def _insert(self, account: Account, attempts: int = 3):
+        for _ in range(attempts):
+            try:
+                with transaction.atomic():
+                    account.save(force_insert=True)
+                return None
+            except IntegrityError as e:
+                if Account.objects.filter(cpf=account.cpf).exists():
+                    return 'CPF já cadastrado'
+                if not Account.objects.filter(number=account.number).exists():
+                    return f'Erro ao inserir conta: {e}'
+                
+                # the number was taken outside the allocator, so the row is retried with a fresh one
+                account.number = AccountNumberGenerator.format(account_number_allocator.allocate())
+        
+        return 'Número de conta já em uso'
+
+    def _reject(self, rejects, row: dict):
+        self.rejected += 1
+        rejects.writerow([row['line'], row['cpf'], row['name'], row['error']])
@@ -0,0 +1,68 @@
+import logging
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from account_api.models import Account, Movement
+from shared.utils import BatchUtils
+
+logger = logging.getLogger('bankmore')
+
+
+class Command(BaseCommand):
+    help = 'Recompute account balances from the movement ledger and report drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Overwrite drifted stored balances with the ledger balance'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of accounts aggregated per query'
+        )
+
+    def handle(self, *args, **options):
+        fix = options['fix']
+        chunk_size = options['chunk_size']
+        
+        checked = 0
+        drifted = 0
+        
+        accounts = Account.objects.order_by('pk').values_list('pk', 'number', 'balance').iterator(chunk_size=chunk_size)
+        
+        for chunk in BatchUtils.chunked(accounts, chunk_size):
+            ledger = Movement.ledger_balances([account_id for account_id, _, _ in chunk])
+            
+            for account_id, number, stored_balance in chunk:
+                checked += 1
+                ledger_balance = ledger.get(account_id, Decimal('0'))
+                
+                if stored_balance == ledger_balance:
+                    continue
+                
+                drifted += 1
+                self.stdout.write(
+                    self.style.WARNING(
+                        f'Account {number}: stored {stored_balance} / ledger {ledger_balance} '
+                        f'(drift {stored_balance - ledger_balance})'
+                    )
+                )
+                
+                if fix:
+                    self._fix_balance(account_id)
+        
+        summary = f'Checked {checked} accounts, {drifted} with drift'
+        if fix and drifted:
+            summary += ' (fixed)'
+        
+        logger.info(summary)
+        self.stdout.write(self.style.SUCCESS(summary) if not drifted or fix else self.style.ERROR(summary))
+
+    def _fix_balance(self, account_id):
+        with transaction.atomic():
+            account = Account.objects.select_for_update().get(pk=account_id)
+            account.balance = account.get_ledger_balance()
+            account.save(update_fields=['balance', 'updated_at'])
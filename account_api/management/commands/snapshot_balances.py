@@ -0,0 +1,38 @@
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from account_api.services import BalanceHistoryService
+
+
+class Command(BaseCommand):
+    help = 'Store the end-of-day balance of every account (defaults to yesterday)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            help='Day to snapshot in YYYY-MM-DD format'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of snapshots written per insert'
+        )
+
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                day = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f"Invalid date: {options['date']}")
+        else:
+            day = timezone.localdate() - timedelta(days=1)
+        
+        if day >= timezone.localdate():
+            raise CommandError(f'Cannot snapshot a day that has not ended: {day}')
+        
+        count = BalanceHistoryService.take_snapshots(day, chunk_size=options['chunk_size'])
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'Stored {count} balance snapshots for {day}')
+        )
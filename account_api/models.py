@@ -1,7 +1,19 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
 from decimal import Decimal
+from shared.identity_map import IdentityMap
 from shared.models import BaseModel
+from shared.sequences import NumberBlockAllocator
+from shared.services import CacheService
 from shared.utils import MovementTypes, AccountNumberGenerator, PasswordHasher
+from shared.exceptions import BankMoreException, ErrorTypes
+
+
+account_number_allocator = NumberBlockAllocator(
+    'contacorrente.numero',
+    start=settings.ACCOUNT_NUMBER_SETTINGS['START'],
+    block_size=settings.ACCOUNT_NUMBER_SETTINGS['BLOCK_SIZE']
+)
 
 
 class Account(BaseModel):
@@ -11,6 +23,7 @@ class Account(BaseModel):
     active = models.BooleanField(default=True)
     password_hash = models.CharField(max_length=100)
     salt = models.CharField(max_length=100)
+    balance = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0'))
     
     class Meta:
         db_table = 'contacorrente'
@@ -19,6 +32,7 @@ class Account(BaseModel):
         indexes = [
             models.Index(fields=['number']),
             models.Index(fields=['cpf']),
+            models.Index(fields=['active', 'updated_at']),
         ]
     
     def __str__(self):
@@ -26,30 +40,44 @@ class Account(BaseModel):
     
     def save(self, *args, **kwargs):
         if not self.number:
-            self.number = AccountNumberGenerator.generate()
+            self.number = AccountNumberGenerator.format(account_number_allocator.allocate())
         super().save(*args, **kwargs)
     
     def deactivate(self):
         self.active = False
-        self.save()
+        self.save(update_fields=['active', 'updated_at'])
+        # evicted once the change is visible, so a concurrent read cannot cache the balance again before it
+        transaction.on_commit(lambda: CacheService.delete(CacheService.get_account_balance_key(self.number)))
     
     def activate(self):
+        from .services import account_number_filter
+        
         self.active = True
-        self.save()
+        self.save(update_fields=['active', 'updated_at'])
+        transaction.on_commit(lambda: account_number_filter.add(self.number))
     
     def verify_password(self, password: str) -> bool:
         return PasswordHasher.verify_password(password, self.salt, self.password_hash)
     
     def get_balance(self) -> Decimal:
-        credits = self.movements.filter(type=MovementTypes.CREDIT).aggregate(
-            total=models.Sum('amount')
-        )['total'] or Decimal('0')
-        
-        debits = self.movements.filter(type=MovementTypes.DEBIT).aggregate(
-            total=models.Sum('amount')
-        )['total'] or Decimal('0')
+        return self.balance
+    
+    def get_ledger_balance(self) -> Decimal:
+        return Movement.ledger_balances([self.pk]).get(self.pk, Decimal('0'))
+    
+    @staticmethod
+    def apply_balance_delta(account_id, delta: Decimal):
+        accounts = Account.objects.filter(pk=account_id)
+        if delta < 0:
+            # the guard and the debit are one statement, so a balance read outside the lock cannot overdraw
+            accounts = accounts.filter(balance__gte=-delta)
         
-        return credits - debits
+        if not accounts.update(balance=models.F('balance') + delta) and delta < 0:
+            raise BankMoreException(
+                "Saldo insuficiente",
+                ErrorTypes.INSUFFICIENT_BALANCE
+            )
+        IdentityMap.evict(Account, account_id)
 
 
 class Movement(BaseModel):
@@ -74,4 +102,45 @@ class Movement(BaseModel):
     def save(self, *args, **kwargs):
         if self.amount <= 0:
             raise ValueError("Amount must be positive")
-        super().save(*args, **kwargs)
+        
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                Account.apply_balance_delta(self.account_id, self.signed_amount)
+    
+    @property
+    def signed_amount(self) -> Decimal:
+        return self.amount if self.type == MovementTypes.CREDIT else -self.amount
+    
+    @staticmethod
+    def ledger_balances(account_ids) -> dict:
+        totals = Movement.objects.filter(account_id__in=account_ids).values(
+            'account_id', 'type'
+        ).annotate(total=models.Sum('amount')).order_by()
+        
+        balances = {}
+        for row in totals:
+            total = row['total'] or Decimal('0')
+            if row['type'] == MovementTypes.DEBIT:
+                total = -total
+            balances[row['account_id']] = balances.get(row['account_id'], Decimal('0')) + total
+        
+        return balances
+
+
+class BalanceSnapshot(BaseModel):
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='balance_snapshots')
+    date = models.DateField()
+    balance = models.DecimalField(max_digits=15, decimal_places=2)
+    
+    class Meta:
+        db_table = 'saldo_diario'
+        verbose_name = 'Saldo Diário'
+        verbose_name_plural = 'Saldos Diários'
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'date'], name='uniq_saldo_diario_conta_data'),
+        ]
+    
+    def __str__(self):
+        return f"Snapshot {self.date} - {self.balance} - Account {self.account.number}"
@@ -1,7 +1,9 @@
 from rest_framework import serializers
 from decimal import Decimal
+from django.conf import settings
 from .models import Account, Movement
 from shared.utils import CPFValidator, PasswordHasher, MovementTypes, MoneyUtils
+from shared.serializers import KeysetCursorField, AccountNumberField, ItemErrorSerializer, validate_batch_items
 from shared.exceptions import BankMoreException, ErrorTypes
 
 
@@ -53,7 +55,7 @@ class LoginSerializer(serializers.Serializer):
 
 class CreateMovementSerializer(serializers.Serializer):
     request_id = serializers.CharField(max_length=255)
-    account_number = serializers.CharField(max_length=10)
+    account_number = AccountNumberField()
     amount = serializers.DecimalField(max_digits=15, decimal_places=2)
     type = serializers.CharField(max_length=1)
     
@@ -74,6 +76,25 @@ class CreateMovementSerializer(serializers.Serializer):
         return value
 
 
+class CreateMovementBatchSerializer(serializers.Serializer):
+    MAX_MOVEMENTS = 5000
+    
+    movements = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=MAX_MOVEMENTS
+    )
+    
+    def validate_movements(self, value):
+        return validate_batch_items(value, CreateMovementSerializer)
+
+
+class MovementBatchResultSerializer(serializers.Serializer):
+    request_id = serializers.CharField(allow_null=True)
+    status = serializers.CharField()
+    error = ItemErrorSerializer(allow_null=True)
+
+
 class DeactivateAccountSerializer(serializers.Serializer):
     password = serializers.CharField(max_length=100, write_only=True)
 
@@ -94,12 +115,113 @@ class MovementSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
+class MovementFilterSerializer(serializers.Serializer):
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    type = serializers.CharField(max_length=1, required=False)
+    
+    def validate_type(self, value):
+        if not MovementTypes.is_valid(value):
+            raise BankMoreException(
+                "Tipo de movimento inválido",
+                ErrorTypes.INVALID_TYPE
+            )
+        return value
+    
+    def validate(self, attrs):
+        start_date = attrs.get('start_date')
+        end_date = attrs.get('end_date')
+        if start_date and end_date and end_date < start_date:
+            raise BankMoreException(
+                "Data final deve ser maior ou igual à data inicial",
+                ErrorTypes.INVALID_ARGUMENT
+            )
+        return attrs
+
+
+class StatementQuerySerializer(MovementFilterSerializer):
+    MAX_PAGE_SIZE = 100
+    
+    cursor = KeysetCursorField(required=False)
+    page_size = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        max_value=MAX_PAGE_SIZE,
+        default=settings.REST_FRAMEWORK['PAGE_SIZE']
+    )
+
+
+class StatementSerializer(serializers.Serializer):
+    account_number = serializers.CharField()
+    results = MovementSerializer(many=True)
+    next_cursor = serializers.CharField(allow_null=True)
+
+
 class BalanceSerializer(serializers.Serializer):
     account_number = serializers.CharField()
     balance = serializers.DecimalField(max_digits=15, decimal_places=2)
     account_name = serializers.CharField()
 
 
+class BulkBalanceRequestSerializer(serializers.Serializer):
+    MAX_ACCOUNTS = 5000
+    
+    account_numbers = serializers.ListField(
+        child=serializers.CharField(max_length=10),
+        allow_empty=False,
+        max_length=MAX_ACCOUNTS
+    )
+
+
+class BulkBalanceItemSerializer(serializers.Serializer):
+    account_number = serializers.CharField()
+    balance = serializers.DecimalField(max_digits=15, decimal_places=2, allow_null=True)
+    error = ItemErrorSerializer(allow_null=True)
+
+
+class BalanceAtQuerySerializer(serializers.Serializer):
+    date = serializers.DateField()
+
+
+class BalanceHistoryQuerySerializer(serializers.Serializer):
+    MAX_DAYS = 366
+    
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    
+    def validate(self, attrs):
+        if attrs['end_date'] < attrs['start_date']:
+            raise BankMoreException(
+                "Data final deve ser maior ou igual à data inicial",
+                ErrorTypes.INVALID_ARGUMENT
+            )
+        
+        if (attrs['end_date'] - attrs['start_date']).days >= self.MAX_DAYS:
+            raise BankMoreException(
+                f"Período máximo de {self.MAX_DAYS} dias",
+                ErrorTypes.INVALID_ARGUMENT
+            )
+        return attrs
+
+
+class BalanceAtSerializer(serializers.Serializer):
+    account_number = serializers.CharField()
+    date = serializers.DateField()
+    balance = serializers.DecimalField(max_digits=15, decimal_places=2)
+
+
+class DailyBalanceSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    balance = serializers.DecimalField(max_digits=15, decimal_places=2)
+
+
+class BalanceHistorySerializer(serializers.Serializer):
+    account_number = serializers.CharField()
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    balances = DailyBalanceSerializer(many=True)
+
+
 class CreateAccountResponseSerializer(serializers.Serializer):
     account_number = serializers.CharField()
     message = serializers.CharField()
@@ -1,15 +1,123 @@
 import logging
+import threading
+import time
+from datetime import date, datetime, timedelta
 from decimal import Decimal
-from django.db import transaction
-from .models import Account, Movement
-from shared.utils import PasswordHasher, MovementTypes
+from django.db import models, transaction
+from django.core.cache import cache
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+from .models import Account, Movement, BalanceSnapshot
+from shared.utils import PasswordHasher, MovementTypes, BatchUtils, BatchItemStatus, BloomFilter, DateUtils, KeysetCursor, AccountNumberGenerator
 from shared.authentication import JWTService
+from shared.identity_map import IdentityMap
+from shared.locks import AccountLocks
 from shared.services import IdempotencyService, CacheService
 from shared.exceptions import BankMoreException, ErrorTypes
 
 logger = logging.getLogger('bankmore')
 
 
+class AccountNumberFilter:
+    VERSION_KEY = 'account_number_filter:version'
+    ERROR_RATE = 0.001
+    MIN_CAPACITY = 100000
+    REBUILD_INTERVAL = 3600
+    SYNC_SKEW = timedelta(seconds=5)
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._version = None
+        self._built_at = 0.0
+        self._synced_at = None
+    
+    def might_exist(self, account_number: str) -> bool:
+        try:
+            self._ensure_fresh()
+            
+            if account_number in self._filter:
+                return True
+            
+            if self._shared_version() != self._version:
+                self._sync()
+                return account_number in self._filter
+            
+            return False
+            
+        except Exception as e:
+            logger.warning(f"Account number filter unavailable, falling back to database: {e}")
+            return True
+    
+    def warm_up(self):
+        try:
+            self._ensure_fresh()
+        except Exception as e:
+            logger.warning(f"Account number filter warm-up failed, it will be built on first use: {e}")
+    
+    def add(self, account_number: str):
+        try:
+            self._ensure_fresh()
+            self._filter.add(account_number)
+        except Exception as e:
+            logger.warning(f"Failed to add {account_number} to the account number filter: {e}")
+        
+        self.notify_changed()
+    
+    def notify_changed(self):
+        try:
+            cache.add(self.VERSION_KEY, 0, timeout=None)
+            cache.incr(self.VERSION_KEY)
+        except Exception as e:
+            logger.warning(f"Failed to publish account number filter version: {e}")
+    
+    def _shared_version(self):
+        return cache.get(self.VERSION_KEY, 0)
+    
+    def _ensure_fresh(self):
+        if self._filter is not None and time.monotonic() - self._built_at < self.REBUILD_INTERVAL:
+            return
+        
+        with self._lock:
+            if self._filter is not None and time.monotonic() - self._built_at < self.REBUILD_INTERVAL:
+                return
+            
+            version = self._shared_version()
+            synced_at = timezone.now()
+            active_accounts = Account.objects.filter(active=True)
+            
+            bloom = BloomFilter(max(active_accounts.count() * 2, self.MIN_CAPACITY), self.ERROR_RATE)
+            for number in active_accounts.values_list('number', flat=True).iterator(chunk_size=10000):
+                bloom.add(number)
+            
+            self._filter = bloom
+            self._version = version
+            self._synced_at = synced_at
+            self._built_at = time.monotonic()
+            
+            logger.info(f"Account number filter built: {bloom.size} bits, {bloom.hash_count} hashes")
+    
+    def _sync(self):
+        with self._lock:
+            version = self._shared_version()
+            if version == self._version:
+                return
+            
+            synced_at = timezone.now()
+            # served by the (active, updated_at) index, so each version bump reads only the recent changes
+            for number in Account.objects.filter(
+                active=True,
+                updated_at__gte=self._synced_at - self.SYNC_SKEW
+            ).values_list('number', flat=True):
+                self._filter.add(number)
+            
+            self._version = version
+            self._synced_at = synced_at
+
+
+account_number_filter = AccountNumberFilter()
+
+
 class AccountService:
     @staticmethod
     def create_account(cpf: str, name: str, password: str) -> dict:
@@ -24,6 +132,8 @@ class AccountService:
                 salt=salt
             )
             
+            transaction.on_commit(lambda: account_number_filter.add(account.number))
+            
             logger.info(f"Account created: {account.number} for CPF: {cpf}")
             
             return {
@@ -84,9 +194,6 @@ class AccountService:
             
             account.deactivate()
             
-            cache_key = CacheService.get_account_balance_key(account.number)
-            CacheService.delete(cache_key)
-            
             logger.info(f"Account deactivated: {account.number}")
             
         except Account.DoesNotExist:
@@ -109,70 +216,161 @@ class AccountService:
         if cached_response:
             return cached_response
         
-        try:
-            account = Account.objects.get(number=account_number)
-            
-            if not account.active:
-                raise BankMoreException(
-                    "Conta inativa",
-                    ErrorTypes.INACTIVE_ACCOUNT
-                )
-            
-            if user_account_id and str(account.id) != user_account_id:
+        with IdempotencyService.release_on_error(request_id):
+            try:
+                account = IdentityMap.get(Account, 'number', account_number)
+                
+                # the balance is re-read under the account lock so concurrent debits cannot both pass the check
+                with AccountLocks.hold(account.pk) as locked_accounts:
+                    account = locked_accounts[str(account.pk)]
+                    AccountService._validate_movement(account, amount, movement_type, account.get_balance(), user_account_id)
+                    
+                    movement = Movement.objects.create(
+                        account=account,
+                        amount=amount,
+                        type=movement_type,
+                        idempotency_key=request_id
+                    )
+                    
+                    AccountService.refresh_cached_balance(account.number)
+                    
+                    logger.info(f"Movement created: {movement.type} {movement.amount} for account {account.number}")
+                    
+                    response = {'message': 'Movimentação realizada com sucesso'}
+                    IdempotencyService.save_response(request_id, response)
+                    
+                    return response
+                    
+            except Account.DoesNotExist:
                 raise BankMoreException(
-                    "Operação não autorizada para esta conta",
-                    ErrorTypes.INVALID_OPERATION
+                    "Conta não encontrada",
+                    ErrorTypes.ACCOUNT_NOT_FOUND
                 )
+    
+    @staticmethod
+    def create_movements_batch(entries: list, user_account_id: str = None) -> list:
+        results = [None] * len(entries)
+        pending = {}
+        
+        for index, entry in enumerate(entries):
+            if entry['error']:
+                results[index] = AccountService._batch_result(entry['request_id'], BatchItemStatus.REJECTED, entry['error'])
+            elif entry['data']['request_id'] in pending:
+                results[index] = AccountService._batch_result(entry['request_id'], BatchItemStatus.DUPLICATE)
+            else:
+                pending[entry['data']['request_id']] = index
+        
+        if not pending:
+            return results
+        
+        cached_responses = IdempotencyService.check_idempotency_many({
+            request_id: {
+                'account_number': entries[index]['data']['account_number'],
+                'amount': str(entries[index]['data']['amount']),
+                'type': entries[index]['data']['type']
+            }
+            for request_id, index in pending.items()
+        })
+        
+        for request_id in cached_responses:
+            results[pending.pop(request_id)] = AccountService._batch_result(request_id, BatchItemStatus.DUPLICATE)
+        
+        account_ids = Account.objects.filter(
+            number__in={entries[index]['data']['account_number'] for index in pending.values()}
+        ).values_list('pk', flat=True)
+        
+        with IdempotencyService.release_on_error(*pending), AccountLocks.hold(*account_ids) as locked_accounts:
+            accounts = {account.number: account for account in locked_accounts.values()}
+            balances = {}
+            movements = []
             
-            if movement_type == MovementTypes.DEBIT:
-                current_balance = account.get_balance()
-                if current_balance < amount:
-                    raise BankMoreException(
-                        "Saldo insuficiente",
-                        ErrorTypes.INSUFFICIENT_BALANCE
+            for request_id, index in pending.items():
+                data = entries[index]['data']
+                account = accounts.get(data['account_number'])
+                
+                try:
+                    if account is None:
+                        raise BankMoreException(
+                            "Conta não encontrada",
+                            ErrorTypes.ACCOUNT_NOT_FOUND
+                        )
+                    
+                    balance = balances.get(account.number, account.balance)
+                    AccountService._validate_movement(account, data['amount'], data['type'], balance, user_account_id)
+                    
+                except BankMoreException as e:
+                    results[index] = AccountService._batch_result(
+                        request_id,
+                        BatchItemStatus.REJECTED,
+                        {'message': e.message, 'type': e.error_type}
                     )
-            
-            with transaction.atomic():
-                movement = Movement.objects.create(
+                    continue
+                
+                movement = Movement(
                     account=account,
-                    amount=amount,
-                    type=movement_type,
+                    amount=data['amount'],
+                    type=data['type'],
                     idempotency_key=request_id
                 )
-                
-                cache_key = CacheService.get_account_balance_key(account.number)
-                CacheService.delete(cache_key)
-                
-                logger.info(f"Movement created: {movement.type} {movement.amount} for account {account.number}")
-                
-                response = {'message': 'Movimentação realizada com sucesso'}
-                IdempotencyService.save_response(request_id, response)
-                
-                return response
-                
-        except Account.DoesNotExist:
+                movements.append(movement)
+                balances[account.number] = balance + movement.signed_amount
+                results[index] = AccountService._batch_result(request_id, BatchItemStatus.APPLIED)
+            
+            Movement.objects.bulk_create(movements, batch_size=500)
+            
+            for account_number, balance in balances.items():
+                account = accounts[account_number]
+                Account.apply_balance_delta(account.pk, balance - account.balance)
+                AccountService.refresh_cached_balance(account_number)
+            
+            IdempotencyService.save_responses({
+                movement.idempotency_key: {'message': 'Movimentação realizada com sucesso'}
+                for movement in movements
+            })
+        
+        IdempotencyService.release_many([
+            request_id for request_id, index in pending.items()
+            if results[index]['status'] == BatchItemStatus.REJECTED
+        ])
+        
+        logger.info(f"Movement batch processed: {len(movements)} applied out of {len(entries)} items")
+        return results
+    
+    @staticmethod
+    def _validate_movement(account: Account, amount: Decimal, movement_type: str, current_balance: Decimal, user_account_id: str = None):
+        if not account.active:
             raise BankMoreException(
-                "Conta não encontrada",
-                ErrorTypes.ACCOUNT_NOT_FOUND
+                "Conta inativa",
+                ErrorTypes.INACTIVE_ACCOUNT
+            )
+        
+        if user_account_id and str(account.id) != user_account_id:
+            raise BankMoreException(
+                "Operação não autorizada para esta conta",
+                ErrorTypes.INVALID_OPERATION
+            )
+        
+        if movement_type == MovementTypes.DEBIT and current_balance < amount:
+            raise BankMoreException(
+                "Saldo insuficiente",
+                ErrorTypes.INSUFFICIENT_BALANCE
             )
     
+    @staticmethod
+    def _batch_result(request_id: str, status: str, error: dict = None) -> dict:
+        return {'request_id': request_id, 'status': status, 'error': error}
+    
     @staticmethod
     def get_balance(account_id: str) -> dict:
         try:
             account = Account.objects.get(id=account_id)
             
-            cache_key = CacheService.get_account_balance_key(account.number)
-            cached_balance = CacheService.get(cache_key)
-            
-            if cached_balance is not None:
-                return {
-                    'account_number': account.number,
-                    'balance': cached_balance,
-                    'account_name': account.name
-                }
-            
-            balance = account.get_balance()
-            CacheService.set(cache_key, balance, timeout=300)
+            # only active accounts are cached, so a cached balance always means the account is active
+            if account.active:
+                cache_key = CacheService.get_account_balance_key(account.number)
+                balance = CacheService.get_or_refresh(cache_key, account.get_balance, timeout=300)
+            else:
+                balance = account.get_balance()
             
             return {
                 'account_number': account.number,
@@ -188,6 +386,8 @@ class AccountService:
     
     @staticmethod
     def get_balance_by_account_number(account_number: str) -> dict:
+        AccountService.validate_account_number(account_number)
+        
         try:
             account = Account.objects.get(number=account_number)
             
@@ -198,17 +398,7 @@ class AccountService:
                 )
             
             cache_key = CacheService.get_account_balance_key(account.number)
-            cached_balance = CacheService.get(cache_key)
-            
-            if cached_balance is not None:
-                return {
-                    'account_number': account.number,
-                    'balance': cached_balance,
-                    'account_name': account.name
-                }
-            
-            balance = account.get_balance()
-            CacheService.set(cache_key, balance, timeout=300)
+            balance = CacheService.get_or_refresh(cache_key, account.get_balance, timeout=300)
             
             return {
                 'account_number': account.number,
@@ -222,6 +412,273 @@ class AccountService:
                 ErrorTypes.ACCOUNT_NOT_FOUND
             )
     
+    @staticmethod
+    def get_statement(account_id: str, page_size: int, cursor: str = None, start_date: date = None, end_date: date = None, movement_type: str = None) -> dict:
+        try:
+            account = Account.objects.get(id=account_id)
+            
+            movements = AccountService._filter_movements(account, start_date, end_date, movement_type)
+            
+            if cursor:
+                created_at, pk = KeysetCursor.decode(cursor)
+                movements = movements.filter(
+                    models.Q(created_at__lt=created_at) | models.Q(created_at=created_at, id__lt=pk)
+                )
+            
+            page = list(movements.order_by('-created_at', '-id')[:page_size + 1])
+            
+            next_cursor = None
+            if len(page) > page_size:
+                page = page[:page_size]
+                next_cursor = KeysetCursor.encode(page[-1].created_at, page[-1].id)
+            
+            return {
+                'account_number': account.number,
+                'results': page,
+                'next_cursor': next_cursor
+            }
+            
+        except Account.DoesNotExist:
+            raise BankMoreException(
+                "Conta não encontrada",
+                ErrorTypes.ACCOUNT_NOT_FOUND
+            )
+    
+    @staticmethod
+    def export_statement(account_id: str, start_date: date = None, end_date: date = None, movement_type: str = None, chunk_size: int = 2000):
+        try:
+            account = Account.objects.get(id=account_id)
+            
+            movements = AccountService._filter_movements(account, start_date, end_date, movement_type)
+            
+            return movements.order_by('created_at', 'id').values(
+                'id', 'created_at', 'type', 'amount', 'description', 'idempotency_key'
+            ).iterator(chunk_size=chunk_size)
+            
+        except Account.DoesNotExist:
+            raise BankMoreException(
+                "Conta não encontrada",
+                ErrorTypes.ACCOUNT_NOT_FOUND
+            )
+    
+    @staticmethod
+    def _filter_movements(account: Account, start_date: date = None, end_date: date = None, movement_type: str = None):
+        movements = Movement.objects.filter(account=account)
+        
+        if start_date:
+            movements = movements.filter(created_at__gte=DateUtils.start_of_day(start_date))
+        if end_date:
+            movements = movements.filter(created_at__lt=DateUtils.end_of_day(end_date))
+        if movement_type:
+            movements = movements.filter(type=movement_type)
+        
+        return movements
+    
+    @staticmethod
+    def get_balances(account_numbers: list) -> list:
+        account_numbers = list(dict.fromkeys(account_numbers))
+        keys = {
+            number: CacheService.get_account_balance_key(number)
+            for number in account_numbers if AccountNumberGenerator.is_valid(number)
+        }
+        
+        # balances are cached for active accounts only and evicted when one is deactivated, so a hit is an active account
+        cached = CacheService.get_many(list(keys.values()))
+        balances = {number: cached[key] for number, key in keys.items() if key in cached}
+        
+        missing = [number for number in keys if number not in balances]
+        accounts = {}
+        if missing:
+            accounts = {
+                row['number']: row
+                for row in Account.objects.filter(number__in=missing).values('number', 'active', 'balance')
+            }
+            CacheService.set_many({
+                keys[number]: row['balance']
+                for number, row in accounts.items() if row['active']
+            }, timeout=300)
+        
+        results = []
+        for number in account_numbers:
+            item = {'account_number': number, 'balance': None, 'error': None}
+            
+            if number not in keys:
+                item['error'] = {'message': 'Número de conta inválido', 'type': ErrorTypes.INVALID_ACCOUNT}
+            elif number in balances:
+                item['balance'] = balances[number]
+            elif number not in accounts:
+                item['error'] = {'message': 'Conta não encontrada', 'type': ErrorTypes.ACCOUNT_NOT_FOUND}
+            elif not accounts[number]['active']:
+                item['error'] = {'message': 'Conta inativa', 'type': ErrorTypes.INACTIVE_ACCOUNT}
+            else:
+                item['balance'] = accounts[number]['balance']
+            
+            results.append(item)
+        
+        return results
+    
+    @staticmethod
+    def refresh_cached_balance(account_number: str):
+        CacheService.write_through(
+            CacheService.get_account_balance_key(account_number),
+            lambda: Account.objects.filter(number=account_number, active=True).values_list('balance', flat=True).first(),
+            timeout=300
+        )
+    
+    @staticmethod
+    def refresh_cached_balances(account_numbers):
+        account_numbers = list(account_numbers)
+        
+        def refresh():
+            for chunk in BatchUtils.chunked(account_numbers, 500):
+                balances = Account.objects.filter(number__in=chunk, active=True).values_list('number', 'balance')
+                CacheService.set_many({
+                    CacheService.get_account_balance_key(number): balance
+                    for number, balance in balances
+                }, timeout=300)
+        
+        transaction.on_commit(refresh)
+    
+    @staticmethod
+    def validate_account_number(account_number: str):
+        if not AccountNumberGenerator.is_valid(account_number):
+            raise BankMoreException(
+                "Número de conta inválido",
+                ErrorTypes.INVALID_ACCOUNT
+            )
+    
     @staticmethod
     def account_exists(account_number: str) -> bool:
+        if not AccountNumberGenerator.is_valid(account_number) or not account_number_filter.might_exist(account_number):
+            return False
+        
         return Account.objects.filter(number=account_number, active=True).exists()
+
+
+class BalanceHistoryService:
+    @staticmethod
+    def signed_amount_expression():
+        return models.Case(
+            models.When(type=MovementTypes.DEBIT, then=-models.F('amount')),
+            default=models.F('amount'),
+            output_field=models.DecimalField(max_digits=15, decimal_places=2)
+        )
+    
+    @staticmethod
+    def take_snapshots(day: date, chunk_size: int = 1000) -> int:
+        cutoff = DateUtils.end_of_day(day)
+        
+        tail = Movement.objects.filter(
+            account=models.OuterRef('pk'),
+            created_at__gte=cutoff
+        ).values('account').annotate(
+            total=models.Sum(BalanceHistoryService.signed_amount_expression())
+        ).values('total')
+        
+        accounts = Account.objects.filter(created_at__lt=cutoff).annotate(
+            tail=Coalesce(
+                models.Subquery(tail, output_field=models.DecimalField(max_digits=15, decimal_places=2)),
+                Decimal('0'),
+                output_field=models.DecimalField(max_digits=15, decimal_places=2)
+            )
+        ).order_by('pk').values_list('pk', 'balance', 'tail').iterator(chunk_size=chunk_size)
+        
+        created = 0
+        for chunk in BatchUtils.chunked(accounts, chunk_size):
+            snapshots = [
+                BalanceSnapshot(account_id=account_id, date=day, balance=balance - tail)
+                for account_id, balance, tail in chunk
+            ]
+            BalanceSnapshot.objects.bulk_create(
+                snapshots,
+                update_conflicts=True,
+                unique_fields=['account', 'date'],
+                update_fields=['balance', 'updated_at']
+            )
+            created += len(snapshots)
+        
+        logger.info(f"Balance snapshots taken for {day}: {created} accounts")
+        return created
+    
+    @staticmethod
+    def _net_movements(account: Account, start: datetime, end: datetime) -> Decimal:
+        movements = Movement.objects.filter(account=account, created_at__lt=end)
+        if start is not None:
+            movements = movements.filter(created_at__gte=start)
+        
+        return movements.aggregate(
+            total=models.Sum(BalanceHistoryService.signed_amount_expression())
+        )['total'] or Decimal('0')
+    
+    @staticmethod
+    def _balance_at(account: Account, day: date) -> Decimal:
+        snapshot = BalanceSnapshot.objects.filter(
+            account=account,
+            date__lte=day
+        ).order_by('-date').only('date', 'balance').first()
+        
+        if snapshot is None:
+            return BalanceHistoryService._net_movements(account, None, DateUtils.end_of_day(day))
+        
+        return snapshot.balance + BalanceHistoryService._net_movements(
+            account,
+            DateUtils.end_of_day(snapshot.date),
+            DateUtils.end_of_day(day)
+        )
+    
+    @staticmethod
+    def get_balance_at(account_id: str, day: date) -> dict:
+        try:
+            account = Account.objects.get(id=account_id)
+            
+            return {
+                'account_number': account.number,
+                'date': day,
+                'balance': BalanceHistoryService._balance_at(account, day)
+            }
+            
+        except Account.DoesNotExist:
+            raise BankMoreException(
+                "Conta não encontrada",
+                ErrorTypes.ACCOUNT_NOT_FOUND
+            )
+    
+    @staticmethod
+    def get_daily_history(account_id: str, start_date: date, end_date: date) -> dict:
+        try:
+            account = Account.objects.get(id=account_id)
+            
+            opening_day = start_date - timedelta(days=1)
+            balance = BalanceHistoryService._balance_at(account, opening_day)
+            
+            daily_totals = Movement.objects.filter(
+                account=account,
+                created_at__gte=DateUtils.end_of_day(opening_day),
+                created_at__lt=DateUtils.end_of_day(end_date)
+            ).annotate(
+                day=TruncDate('created_at', tzinfo=timezone.get_current_timezone())
+            ).values('day').annotate(
+                total=models.Sum(BalanceHistoryService.signed_amount_expression())
+            ).order_by()
+            
+            net_by_day = {row['day']: row['total'] or Decimal('0') for row in daily_totals}
+            
+            balances = []
+            day = start_date
+            while day <= end_date:
+                balance += net_by_day.get(day, Decimal('0'))
+                balances.append({'date': day, 'balance': balance})
+                day += timedelta(days=1)
+            
+            return {
+                'account_number': account.number,
+                'start_date': start_date,
+                'end_date': end_date,
+                'balances': balances
+            }
+            
+        except Account.DoesNotExist:
+            raise BankMoreException(
+                "Conta não encontrada",
+                ErrorTypes.ACCOUNT_NOT_FOUND
+            )
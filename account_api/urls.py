@@ -6,7 +6,13 @@ urlpatterns = [
     path('login/', views.login, name='account-login'),
     path('deactivate/', views.deactivate, name='account-deactivate'),
     path('movement/', views.movement, name='account-movement'),
+    path('movement/batch/', views.movement_batch, name='account-movement-batch'),
     path('balance/', views.balance, name='account-balance'),
+    path('balance/bulk/', views.balance_bulk, name='account-balance-bulk'),
+    path('balance/at/', views.balance_at, name='account-balance-at'),
+    path('balance/history/', views.balance_history, name='account-balance-history'),
+    path('statement/', views.statement, name='account-statement'),
+    path('statement/export/', views.statement_export, name='account-statement-export'),
     path('exists/<str:account_number>/', views.account_exists, name='account-exists'),
     path('balance/<str:account_number>/', views.balance_by_account_number, name='account-balance-by-number'),
 ]
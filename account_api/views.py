@@ -1,15 +1,21 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.openapi import OpenApiTypes
 from .serializers import (
     CreateAccountSerializer, LoginSerializer, CreateMovementSerializer,
     DeactivateAccountSerializer, BalanceSerializer, CreateAccountResponseSerializer,
-    LoginResponseSerializer
+    LoginResponseSerializer, BalanceAtQuerySerializer, BalanceHistoryQuerySerializer,
+    BalanceAtSerializer, BalanceHistorySerializer, BulkBalanceRequestSerializer,
+    BulkBalanceItemSerializer, StatementQuerySerializer, StatementSerializer,
+    MovementFilterSerializer, CreateMovementBatchSerializer, MovementBatchResultSerializer
 )
-from .services import AccountService
+from .services import AccountService, BalanceHistoryService
+from shared.renderers import CSVStreamRenderer, NDJSONStreamRenderer
+from shared.services import ExportService
 
 
 @extend_schema(
@@ -96,6 +102,26 @@ def movement(request):
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+@extend_schema(
+    request=CreateMovementBatchSerializer,
+    responses={200: MovementBatchResultSerializer(many=True)},
+    description="Realiza um lote de movimentações com resultado por item",
+    tags=["Account"]
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def movement_batch(request):
+    serializer = CreateMovementBatchSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    
+    results = AccountService.create_movements_batch(
+        entries=serializer.validated_data['movements'],
+        user_account_id=request.user.account_id
+    )
+    
+    return Response(MovementBatchResultSerializer(results, many=True).data, status=status.HTTP_200_OK)
+
+
 @extend_schema(
     responses={200: BalanceSerializer},
     description="Consulta o saldo da conta corrente",
@@ -108,6 +134,147 @@ def balance(request):
     return Response(result, status=status.HTTP_200_OK)
 
 
+@extend_schema(
+    parameters=[
+        OpenApiParameter(name='start_date', type=OpenApiTypes.DATE, location=OpenApiParameter.QUERY, description='Data inicial'),
+        OpenApiParameter(name='end_date', type=OpenApiTypes.DATE, location=OpenApiParameter.QUERY, description='Data final'),
+        OpenApiParameter(name='type', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, description='Tipo de movimento (C ou D)'),
+        OpenApiParameter(name='cursor', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, description='Cursor da próxima página'),
+        OpenApiParameter(name='page_size', type=OpenApiTypes.INT, location=OpenApiParameter.QUERY, description='Itens por página'),
+    ],
+    responses={200: StatementSerializer},
+    description="Consulta o extrato da conta com paginação por cursor",
+    tags=["Account"]
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def statement(request):
+    serializer = StatementQuerySerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    
+    result = AccountService.get_statement(
+        account_id=request.user.account_id,
+        page_size=serializer.validated_data['page_size'],
+        cursor=serializer.validated_data.get('cursor'),
+        start_date=serializer.validated_data.get('start_date'),
+        end_date=serializer.validated_data.get('end_date'),
+        movement_type=serializer.validated_data.get('type')
+    )
+    
+    return Response(StatementSerializer(result).data, status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter(name='format', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, description='Formato do arquivo (csv ou ndjson)'),
+        OpenApiParameter(name='start_date', type=OpenApiTypes.DATE, location=OpenApiParameter.QUERY, description='Data inicial'),
+        OpenApiParameter(name='end_date', type=OpenApiTypes.DATE, location=OpenApiParameter.QUERY, description='Data final'),
+        OpenApiParameter(name='type', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, description='Tipo de movimento (C ou D)'),
+    ],
+    responses={200: OpenApiTypes.BINARY},
+    description="Exporta as movimentações da conta em CSV ou NDJSON",
+    tags=["Account"]
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([JSONRenderer, CSVStreamRenderer, NDJSONStreamRenderer])
+def statement_export(request):
+    serializer = MovementFilterSerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    
+    rows = AccountService.export_statement(
+        account_id=request.user.account_id,
+        start_date=serializer.validated_data.get('start_date'),
+        end_date=serializer.validated_data.get('end_date'),
+        movement_type=serializer.validated_data.get('type')
+    )
+    
+    return ExportService.stream(
+        rows,
+        ['id', 'created_at', 'type', 'amount', 'description', 'idempotency_key'],
+        request.accepted_renderer.format,
+        f"extrato-{request.user.account_number}"
+    )
+
+
+@extend_schema(
+    request=BulkBalanceRequestSerializer,
+    responses={200: BulkBalanceItemSerializer(many=True)},
+    description="Consulta o saldo de várias contas em uma única requisição",
+    tags=["Account"]
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def balance_bulk(request):
+    serializer = BulkBalanceRequestSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    
+    results = AccountService.get_balances(serializer.validated_data['account_numbers'])
+    
+    return Response(BulkBalanceItemSerializer(results, many=True).data, status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter(
+            name='date',
+            type=OpenApiTypes.DATE,
+            location=OpenApiParameter.QUERY,
+            description='Data de referência (saldo ao final do dia)'
+        )
+    ],
+    responses={200: BalanceAtSerializer},
+    description="Consulta o saldo da conta ao final de uma data",
+    tags=["Account"]
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def balance_at(request):
+    serializer = BalanceAtQuerySerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    
+    result = BalanceHistoryService.get_balance_at(
+        account_id=request.user.account_id,
+        day=serializer.validated_data['date']
+    )
+    
+    return Response(BalanceAtSerializer(result).data, status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter(
+            name='start_date',
+            type=OpenApiTypes.DATE,
+            location=OpenApiParameter.QUERY,
+            description='Data inicial'
+        ),
+        OpenApiParameter(
+            name='end_date',
+            type=OpenApiTypes.DATE,
+            location=OpenApiParameter.QUERY,
+            description='Data final'
+        )
+    ],
+    responses={200: BalanceHistorySerializer},
+    description="Consulta o saldo diário da conta em um período",
+    tags=["Account"]
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def balance_history(request):
+    serializer = BalanceHistoryQuerySerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    
+    result = BalanceHistoryService.get_daily_history(
+        account_id=request.user.account_id,
+        start_date=serializer.validated_data['start_date'],
+        end_date=serializer.validated_data['end_date']
+    )
+    
+    return Response(BalanceHistorySerializer(result).data, status=status.HTTP_200_OK)
+
+
 @extend_schema(
     parameters=[
         OpenApiParameter(
@@ -0,0 +1,24 @@
+import os
+from celery import Celery
+from django.conf import settings
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bankmore_project.settings.base')
+
+app = Celery('bankmore_project')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
+
+app.conf.beat_schedule = {
+    'purge-idempotency-keys': {
+        'task': 'shared.tasks.purge_idempotency_keys',
+        'schedule': settings.IDEMPOTENCY_SETTINGS['PURGE_INTERVAL'],
+    },
+    'purge-outbox-messages': {
+        'task': 'shared.tasks.purge_outbox_messages',
+        'schedule': settings.OUTBOX_SETTINGS['PURGE_INTERVAL'],
+    },
+    'sweep-pending-transfers': {
+        'task': 'transfer_api.tasks.sweep_pending_transfers',
+        'schedule': settings.TRANSFER_SETTINGS['PENDING_SWEEP_INTERVAL'],
+    },
+}
@@ -44,6 +44,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'shared.middleware.IdentityMapMiddleware',
     'shared.middleware.GlobalExceptionMiddleware',
 ]
 
@@ -147,6 +148,16 @@ KAFKA_SETTINGS = {
     'TOPICS': {
         'TRANSFERS_COMPLETED': 'transfers-completed',
         'FEE_CHARGES': 'fee-charges',
+    },
+    'PRODUCER': {
+        'BLOCKING': config('KAFKA_PRODUCER_BLOCKING', default=False, cast=bool),  # wait for the broker on every send
+        'ACKS': config('KAFKA_PRODUCER_ACKS', default='all'),
+        'LINGER_MS': config('KAFKA_PRODUCER_LINGER_MS', default=10, cast=int),
+        'BATCH_SIZE': config('KAFKA_PRODUCER_BATCH_SIZE', default=65536, cast=int),
+        'COMPRESSION': config('KAFKA_PRODUCER_COMPRESSION', default='gzip'),
+        'BUFFER_MEMORY': config('KAFKA_PRODUCER_BUFFER_MEMORY', default=33554432, cast=int),
+        'MAX_BLOCK_MS': config('KAFKA_PRODUCER_MAX_BLOCK_MS', default=1000, cast=int),
+        'SEND_TIMEOUT': config('KAFKA_PRODUCER_SEND_TIMEOUT', default=10, cast=int),
     }
 }
 
@@ -162,6 +173,23 @@ CACHES = {
     }
 }
 
+IDEMPOTENCY_SETTINGS = {
+    'BACKEND': config('IDEMPOTENCY_BACKEND', default='redis'),  # redis | database
+    'TTL': config('IDEMPOTENCY_TTL', default=86400, cast=int),
+    'CLAIM_TTL': config('IDEMPOTENCY_CLAIM_TTL', default=30, cast=int),
+    'DURABLE_WRITE_BEHIND': config('IDEMPOTENCY_DURABLE_WRITE_BEHIND', default=True, cast=bool),
+    'RETENTION_DAYS': config('IDEMPOTENCY_RETENTION_DAYS', default=7, cast=int),
+    'PURGE_BATCH_SIZE': config('IDEMPOTENCY_PURGE_BATCH_SIZE', default=1000, cast=int),
+    'PURGE_INTERVAL': config('IDEMPOTENCY_PURGE_INTERVAL', default=3600, cast=int),
+}
+
+OUTBOX_SETTINGS = {
+    # published messages are kept this long for inspection and replay, then deleted in batches
+    'RETENTION_DAYS': config('OUTBOX_RETENTION_DAYS', default=7, cast=int),
+    'PURGE_BATCH_SIZE': config('OUTBOX_PURGE_BATCH_SIZE', default=1000, cast=int),
+    'PURGE_INTERVAL': config('OUTBOX_PURGE_INTERVAL', default=3600, cast=int),
+}
+
 CELERY_BROKER_URL = REDIS_URL
 CELERY_RESULT_BACKEND = REDIS_URL
 CELERY_ACCEPT_CONTENT = ['json']
@@ -169,6 +197,63 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+ACCOUNT_NUMBER_SETTINGS = {
+    'START': config('ACCOUNT_NUMBER_START', default=100000, cast=int),
+    'BLOCK_SIZE': config('ACCOUNT_NUMBER_BLOCK_SIZE', default=100, cast=int),
+}
+
+ACCOUNT_API_BASE_URL = config('ACCOUNT_API_BASE_URL', default='http://localhost:8001')
+
+INTERNAL_HTTP_SETTINGS = {
+    'CONNECT_TIMEOUT': config('INTERNAL_HTTP_CONNECT_TIMEOUT', default=0.5, cast=float),
+    'READ_TIMEOUT': config('INTERNAL_HTTP_READ_TIMEOUT', default=3.0, cast=float),
+    'MAX_RETRIES': config('INTERNAL_HTTP_MAX_RETRIES', default=2, cast=int),
+    'BACKOFF_BASE': config('INTERNAL_HTTP_BACKOFF_BASE', default=0.1, cast=float),
+    'BACKOFF_MAX': config('INTERNAL_HTTP_BACKOFF_MAX', default=1.0, cast=float),
+    'POOL_SIZE': config('INTERNAL_HTTP_POOL_SIZE', default=20, cast=int),
+    'BREAKER_FAILURE_THRESHOLD': config('INTERNAL_HTTP_BREAKER_FAILURE_THRESHOLD', default=5, cast=int),
+    'BREAKER_RESET_TIMEOUT': config('INTERNAL_HTTP_BREAKER_RESET_TIMEOUT', default=30, cast=float),
+    # how long to keep polling a request the server reports as still in progress (matches the claim TTL)
+    'IN_PROGRESS_TIMEOUT': config('INTERNAL_HTTP_IN_PROGRESS_TIMEOUT', default=30, cast=float),
+    # seconds between per-endpoint latency/failure summaries in the log; 0 logs them only on close
+    'STATS_LOG_INTERVAL': config('INTERNAL_HTTP_STATS_LOG_INTERVAL', default=300, cast=float),
+}
+
+LEDGER_SETTINGS = {
+    # local: post movements straight to the shared database; http: go through the account API
+    'MODE': config('LEDGER_MODE', default='local'),
+}
+
+ACCOUNT_LOCK_SETTINGS = {
+    'BACKEND': config('ACCOUNT_LOCK_BACKEND', default='auto'),  # auto | database | redis | local
+    'STRIPES': config('ACCOUNT_LOCK_STRIPES', default=1024, cast=int),
+    'TIMEOUT': config('ACCOUNT_LOCK_TIMEOUT', default=10, cast=int),
+    'BLOCKING_TIMEOUT': config('ACCOUNT_LOCK_BLOCKING_TIMEOUT', default=5, cast=int),
+}
+
+TRANSFER_SETTINGS = {
+    # when enabled the API only records the transfer and a Celery worker posts the legs
+    'ASYNC': config('TRANSFER_ASYNC', default=False, cast=bool),
+    # pending transfers older than this are enqueued again, and failed once they pass the second age (seconds)
+    'PENDING_RETRY_AFTER': config('TRANSFER_PENDING_RETRY_AFTER', default=300, cast=int),
+    'PENDING_FAIL_AFTER': config('TRANSFER_PENDING_FAIL_AFTER', default=3600, cast=int),
+    'PENDING_SWEEP_INTERVAL': config('TRANSFER_PENDING_SWEEP_INTERVAL', default=60, cast=int),
+    'DETAIL_CACHE_TIMEOUT': config('TRANSFER_DETAIL_CACHE_TIMEOUT', default=86400, cast=int),
+    'STATS_DEFAULT_DAYS': config('TRANSFER_STATS_DEFAULT_DAYS', default=30, cast=int),
+    'STATS_MAX_DAYS': config('TRANSFER_STATS_MAX_DAYS', default=366, cast=int),
+}
+
+TRANSFER_LIMIT_SETTINGS = {
+    'ENABLED': config('TRANSFER_LIMITS_ENABLED', default=False, cast=bool),
+    # redis enforces the limits atomically; database is best effort under concurrent transfers from one account
+    'BACKEND': config('TRANSFER_LIMITS_BACKEND', default='redis'),  # redis | database
+    # rolling windows of outgoing transfers per account; 0 disables a limit
+    'HOURLY_AMOUNT': config('TRANSFER_LIMIT_HOURLY_AMOUNT', default=20000.00, cast=float),
+    'HOURLY_COUNT': config('TRANSFER_LIMIT_HOURLY_COUNT', default=0, cast=int),
+    'DAILY_AMOUNT': config('TRANSFER_LIMIT_DAILY_AMOUNT', default=100000.00, cast=float),
+    'DAILY_COUNT': config('TRANSFER_LIMIT_DAILY_COUNT', default=0, cast=int),
+}
+
 FEE_SETTINGS = {
     'TRANSFER_FEE_AMOUNT': config('TRANSFER_FEE_AMOUNT', default=2.00, cast=float),
 }
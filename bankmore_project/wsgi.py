@@ -5,3 +5,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bankmore_project.settings.base')
 
 application = get_wsgi_application()
+
+# built before the first request instead of inside it
+from account_api.services import account_number_filter
+account_number_filter.warm_up()
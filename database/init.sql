@@ -6,6 +6,7 @@ CREATE TABLE IF NOT EXISTS contacorrente (
 	ativo INTEGER(1) NOT NULL default 1,
 	senha TEXT(100) NOT NULL,
 	salt TEXT(100) NOT NULL,
+	saldo REAL NOT NULL default 0,
 	created_at TEXT(25) NOT NULL,
 	updated_at TEXT(25) NOT NULL,
 	CHECK (ativo in (0,1))
@@ -25,6 +26,33 @@ CREATE TABLE IF NOT EXISTS movimento (
 	FOREIGN KEY(account_id) REFERENCES contacorrente(id)
 );
 
+CREATE TABLE IF NOT EXISTS saldo_diario (
+	id TEXT(37) PRIMARY KEY,
+	account_id TEXT(37) NOT NULL,
+	data TEXT(10) NOT NULL,
+	saldo REAL NOT NULL,
+	created_at TEXT(25) NOT NULL,
+	updated_at TEXT(25) NOT NULL,
+	UNIQUE(account_id, data),
+	FOREIGN KEY(account_id) REFERENCES contacorrente(id)
+);
+
+CREATE TABLE IF NOT EXISTS resumo_diario (
+	id TEXT(37) PRIMARY KEY,
+	account_id TEXT(37) NOT NULL,
+	data TEXT(10) NOT NULL,
+	valor_enviado REAL NOT NULL DEFAULT 0,
+	qtd_enviadas INTEGER NOT NULL DEFAULT 0,
+	valor_recebido REAL NOT NULL DEFAULT 0,
+	qtd_recebidas INTEGER NOT NULL DEFAULT 0,
+	valor_tarifas REAL NOT NULL DEFAULT 0,
+	qtd_tarifas INTEGER NOT NULL DEFAULT 0,
+	created_at TEXT(25) NOT NULL,
+	updated_at TEXT(25) NOT NULL,
+	UNIQUE(account_id, data),
+	FOREIGN KEY(account_id) REFERENCES contacorrente(id)
+);
+
 CREATE TABLE IF NOT EXISTS tarifa (
 	id TEXT(37) PRIMARY KEY,
 	account_id TEXT(37) NOT NULL,
@@ -48,6 +76,7 @@ CREATE TABLE IF NOT EXISTS transferencia (
 	description TEXT(255),
 	data_conclusao TEXT(25),
 	idempotency_key TEXT(37),
+	batch_id TEXT(37),
 	created_at TEXT(25) NOT NULL,
 	updated_at TEXT(25) NOT NULL,
 	CHECK (status in (0,1,2)),
@@ -65,6 +94,25 @@ CREATE TABLE IF NOT EXISTS idempotencia (
 	updated_at TEXT(25) NOT NULL
 );
 
+CREATE TABLE IF NOT EXISTS outbox (
+	id TEXT(37) PRIMARY KEY,
+	topic TEXT(100) NOT NULL,
+	key TEXT(255),
+	payload TEXT NOT NULL,
+	published_at TEXT(25),
+	attempts INTEGER NOT NULL DEFAULT 0,
+	created_at TEXT(25) NOT NULL,
+	updated_at TEXT(25) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS sequencia (
+	id TEXT(37) PRIMARY KEY,
+	nome TEXT(100) NOT NULL UNIQUE,
+	proximo_valor INTEGER NOT NULL,
+	created_at TEXT(25) NOT NULL,
+	updated_at TEXT(25) NOT NULL
+);
+
 -- Indexes for performance
 CREATE INDEX IF NOT EXISTS idx_movimento_conta ON movimento(account_id);
 CREATE INDEX IF NOT EXISTS idx_movimento_created ON movimento(created_at);
@@ -74,6 +122,7 @@ CREATE INDEX IF NOT EXISTS idx_transferencia_origem ON transferencia(origin_acco
 CREATE INDEX IF NOT EXISTS idx_transferencia_destino ON transferencia(destination_account_id);
 CREATE INDEX IF NOT EXISTS idx_transferencia_created ON transferencia(created_at);
 CREATE INDEX IF NOT EXISTS idx_transferencia_idempotency ON transferencia(idempotency_key);
+CREATE INDEX IF NOT EXISTS idx_transferencia_batch ON transferencia(batch_id);
 CREATE INDEX IF NOT EXISTS idx_transferencia_status ON transferencia(status);
 
 CREATE INDEX IF NOT EXISTS idx_tarifa_conta ON tarifa(account_id);
@@ -83,5 +132,8 @@ CREATE INDEX IF NOT EXISTS idx_tarifa_type ON tarifa(type);
 
 CREATE INDEX IF NOT EXISTS idx_contacorrente_numero ON contacorrente(numero);
 CREATE INDEX IF NOT EXISTS idx_contacorrente_cpf ON contacorrente(cpf);
+CREATE INDEX IF NOT EXISTS idx_contacorrente_ativo_updated ON contacorrente(ativo, updated_at);
 
 CREATE INDEX IF NOT EXISTS idx_idempotencia_chave ON idempotencia(chave_idempotencia);
+CREATE INDEX IF NOT EXISTS idx_idempotencia_created ON idempotencia(created_at);
+CREATE INDEX IF NOT EXISTS idx_outbox_pending ON outbox(published_at, created_at);
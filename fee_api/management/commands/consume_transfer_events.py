@@ -1,5 +1,6 @@
 import json
 import logging
+import time
 from django.core.management.base import BaseCommand
 from django.conf import settings
 from kafka import KafkaConsumer
@@ -11,6 +12,31 @@ logger = logging.getLogger('bankmore')
 class Command(BaseCommand):
     help = 'Consume transfer events from Kafka and process fees'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch',
+            action='store_true',
+            help='Charge fees in batches and commit offsets only after each batch is stored'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Maximum number of events per batch'
+        )
+        parser.add_argument(
+            '--max-wait-ms',
+            type=int,
+            default=1000,
+            help='Maximum time spent filling a batch'
+        )
+        parser.add_argument(
+            '--retry-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait before retrying a batch that failed'
+        )
+
     def handle(self, *args, **options):
         kafka_settings = settings.KAFKA_SETTINGS
         topic = kafka_settings['TOPICS']['TRANSFERS_COMPLETED']
@@ -21,7 +47,8 @@ class Command(BaseCommand):
             group_id='fee-api-group',
             value_deserializer=lambda m: json.loads(m.decode('utf-8')),
             auto_offset_reset='latest',
-            enable_auto_commit=True
+            enable_auto_commit=not options['batch'],
+            max_poll_records=options['batch_size']
         )
         
         self.stdout.write(
@@ -29,25 +56,70 @@ class Command(BaseCommand):
         )
         
         try:
-            for message in consumer:
-                try:
-                    transfer_data = message.value
-                    self.stdout.write(f'Processing transfer: {transfer_data.get("id")}')
-                    
-                    FeeService.process_transfer_fee(transfer_data)
-                    
-                    self.stdout.write(
-                        self.style.SUCCESS(f'Successfully processed fee for transfer: {transfer_data.get("id")}')
-                    )
-                    
-                except Exception as e:
-                    logger.error(f'Error processing transfer event: {e}')
-                    self.stdout.write(
-                        self.style.ERROR(f'Error processing transfer event: {e}')
-                    )
-                    
+            if options['batch']:
+                self._consume_batches(consumer, options)
+            else:
+                self._consume(consumer)
+        
         except KeyboardInterrupt:
             self.stdout.write(self.style.WARNING('Stopping consumer...'))
         finally:
             consumer.close()
             self.stdout.write(self.style.SUCCESS('Consumer stopped'))
+
+    def _consume(self, consumer):
+        for message in consumer:
+            try:
+                transfer_data = message.value
+                self.stdout.write(f'Processing transfer: {transfer_data.get("id")}')
+                
+                FeeService.process_transfer_fee(transfer_data)
+                
+                self.stdout.write(
+                    self.style.SUCCESS(f'Successfully processed fee for transfer: {transfer_data.get("id")}')
+                )
+            
+            except Exception as e:
+                logger.error(f'Error processing transfer event: {e}')
+                self.stdout.write(
+                    self.style.ERROR(f'Error processing transfer event: {e}')
+                )
+
+    def _consume_batches(self, consumer, options):
+        while True:
+            batch = self._poll_batch(consumer, options['batch_size'], options['max_wait_ms'])
+            if not batch:
+                continue
+            
+            events = [message.value for messages in batch.values() for message in messages]
+            try:
+                charged = FeeService.process_transfer_fees(events)
+            except Exception as e:
+                logger.error(f'Error processing batch of {len(events)} transfer events: {e}')
+                # nothing was committed, so rewinding makes the next poll deliver the same events again
+                for partition, messages in batch.items():
+                    consumer.seek(partition, messages[0].offset)
+                time.sleep(options['retry_interval'])
+                continue
+            
+            # offsets move only once the fees are durable; a crash before this line replays the batch,
+            # and fees already stored are skipped by their request id
+            consumer.commit()
+            logger.info(f'Processed batch of {len(events)} transfer events, {charged} fees charged')
+
+    def _poll_batch(self, consumer, batch_size: int, max_wait_ms: int) -> dict:
+        deadline = time.monotonic() + max_wait_ms / 1000
+        batch = {}
+        received = 0
+        
+        while received < batch_size:
+            remaining_ms = int((deadline - time.monotonic()) * 1000)
+            if remaining_ms <= 0:
+                break
+            
+            records = consumer.poll(timeout_ms=remaining_ms, max_records=batch_size - received)
+            for partition, messages in records.items():
+                batch.setdefault(partition, []).extend(messages)
+                received += len(messages)
+        
+        return batch
@@ -4,9 +4,13 @@ from decimal import Decimal
 from django.db import transaction
 from django.conf import settings
 from .models import Fee
-from account_api.models import Account
+from account_api.models import Account, Movement
+from account_api.services import AccountService
+from transfer_api.services import TransferStatsService
+from shared.http_client import account_api_client
+from shared.ledger import LedgerService
+from shared.locks import AccountLocks
 from shared.utils import MovementTypes
-from shared.services import CacheService
 from shared.exceptions import BankMoreException, ErrorTypes
 
 logger = logging.getLogger('bankmore')
@@ -16,82 +20,194 @@ class AccountApiService:
     @staticmethod
     def create_movement(account_number: str, amount: Decimal, movement_type: str, request_id: str):
         try:
-            account_api_url = getattr(settings, 'ACCOUNT_API_BASE_URL', 'http://localhost:8001')
-            
-            response = requests.post(
-                f"{account_api_url}/api/account/movement/",
+            response = account_api_client.post(
+                "/api/account/movement/",
                 json={
                     'request_id': request_id,
                     'account_number': account_number,
                     'amount': str(amount),
                     'type': movement_type
-                },
-                timeout=30
+                }
             )
             
-            if response.status_code not in [200, 204]:
-                logger.error(f"Account API error: {response.status_code} - {response.text}")
-                return False
-                
-            return True
-            
         except requests.RequestException as e:
             logger.error(f"Account API request failed: {e}")
-            return False
+            raise BankMoreException(
+                "Erro de comunicação com a API de contas",
+                ErrorTypes.INTERNAL_ERROR
+            )
+        
+        if response.status_code in [200, 204]:
+            return True
+        
+        logger.error(f"Account API error: {response.status_code} - {response.text}")
+        
+        # a server error or a request still in progress says nothing about the debit; only a rejection is final
+        if response.status_code >= 500 or response.status_code == 409:
+            raise BankMoreException(
+                "Erro ao processar movimentação na conta",
+                ErrorTypes.INTERNAL_ERROR
+            )
+        
+        return False
 
 
 class FeeService:
     @staticmethod
     def process_transfer_fee(transfer_data: dict):
         try:
-            origin_account_number = transfer_data.get('origin_account_number')
-            destination_account_number = transfer_data.get('destination_account_number')
-            transfer_amount = Decimal(transfer_data.get('amount', '0'))
-            request_id = transfer_data.get('request_id')
-            
-            fee_settings = settings.FEE_SETTINGS
-            fee_amount = Decimal(str(fee_settings['TRANSFER_FEE_AMOUNT']))
-            
-            try:
-                origin_account = Account.objects.get(number=origin_account_number)
-                
-                if not origin_account.active:
-                    logger.warning(f"Cannot charge fee for inactive account: {origin_account_number}")
-                    return
-                
-                with transaction.atomic():
-                    fee = Fee.objects.create(
-                        account=origin_account,
-                        amount=fee_amount,
-                        type='TRANSFER',
-                        description=f'Taxa de transferência - Destino: {destination_account_number}',
-                        request_id=f"{request_id}-fee"
-                    )
-                    
-                    fee_request_id = f"{request_id}-fee-debit"
-                    success = AccountApiService.create_movement(
-                        origin_account_number,
-                        fee_amount,
-                        MovementTypes.DEBIT,
-                        fee_request_id
-                    )
-                    
-                    if success:
-                        cache_key = CacheService.get_account_balance_key(origin_account_number)
-                        CacheService.delete(cache_key)
-                        
-                        logger.info(f"Transfer fee processed: {fee.id} for account {origin_account_number}")
-                    else:
-                        logger.error(f"Failed to debit fee for account {origin_account_number}")
-                        
-            except Account.DoesNotExist:
-                logger.error(f"Account not found for fee processing: {origin_account_number}")
-                
+            FeeService._charge_remote(transfer_data)
         except Exception as e:
             logger.error(f"Error processing transfer fee: {e}")
     
+    @staticmethod
+    def process_transfer_fees(events: list, chunk_size: int = 500) -> int:
+        fee_amount = Decimal(str(settings.FEE_SETTINGS['TRANSFER_FEE_AMOUNT']))
+        
+        # redelivered or duplicated events collapse onto the fee request id, which is also checked against past batches
+        unique_events = {}
+        for event in events:
+            request_id = event.get('request_id') or event.get('id')
+            if not request_id:
+                logger.error(f"Transfer event without request id: {event}")
+                continue
+            unique_events.setdefault(f"{request_id}-fee", event)
+        
+        charged = set(Fee.objects.filter(request_id__in=list(unique_events)).values_list('request_id', flat=True))
+        pending = {request_id: event for request_id, event in unique_events.items() if request_id not in charged}
+        
+        if settings.LEDGER_SETTINGS['MODE'] != 'local':
+            # failures reaching the account API or the database propagate, so the consumer rewinds the batch
+            return sum(FeeService._charge_remote(event) for event in pending.values())
+        
+        accounts = Account.objects.in_bulk(
+            {event.get('origin_account_number') for event in pending.values()},
+            field_name='number'
+        )
+        
+        fees = []
+        movements = []
+        available = {}
+        for fee_request_id, event in pending.items():
+            origin_account_number = event.get('origin_account_number')
+            origin_account = accounts.get(origin_account_number)
+            
+            if origin_account is None:
+                logger.error(f"Account not found for fee processing: {origin_account_number}")
+                continue
+            
+            if not origin_account.active:
+                logger.warning(f"Cannot charge fee for inactive account: {origin_account_number}")
+                continue
+            
+            available.setdefault(origin_account.pk, origin_account.balance)
+            if available[origin_account.pk] < fee_amount:
+                logger.error(f"Failed to debit fee for account {origin_account_number}: insufficient balance")
+                continue
+            available[origin_account.pk] -= fee_amount
+            
+            fees.append(Fee(
+                account=origin_account,
+                amount=fee_amount,
+                type='TRANSFER',
+                description=f"Taxa de transferência - Destino: {event.get('destination_account_number')}",
+                request_id=fee_request_id
+            ))
+            movements.append(Movement(
+                account=origin_account,
+                amount=fee_amount,
+                type=MovementTypes.DEBIT,
+                description='Taxa de transferência',
+                idempotency_key=f"{fee_request_id}-debit"
+            ))
+        
+        if not fees:
+            return 0
+        
+        try:
+            FeeService._charge(fees, movements, chunk_size)
+        except BankMoreException as e:
+            if e.error_type != ErrorTypes.INSUFFICIENT_BALANCE:
+                raise
+            
+            # a balance spent since it was read fails the whole batch, so the fees are retried one by one
+            logger.warning(f"Fee batch hit an insufficient balance, charging {len(fees)} fees individually")
+            charged_fees = []
+            for fee, movement in zip(fees, movements):
+                try:
+                    FeeService._charge([fee], [movement], chunk_size)
+                    charged_fees.append(fee)
+                except BankMoreException as e:
+                    if e.error_type != ErrorTypes.INSUFFICIENT_BALANCE:
+                        raise
+                    logger.error(f"Failed to debit fee for account {fee.account.number}: insufficient balance")
+            fees = charged_fees
+        
+        logger.info(f"Transfer fee batch processed: {len(fees)} fees charged out of {len(events)} events")
+        return len(fees)
+    
+    @staticmethod
+    def _charge_remote(transfer_data: dict) -> bool:
+        origin_account_number = transfer_data.get('origin_account_number')
+        destination_account_number = transfer_data.get('destination_account_number')
+        request_id = transfer_data.get('request_id')
+        
+        fee_settings = settings.FEE_SETTINGS
+        fee_amount = Decimal(str(fee_settings['TRANSFER_FEE_AMOUNT']))
+        
+        try:
+            origin_account = Account.objects.get(number=origin_account_number)
+        except Account.DoesNotExist:
+            logger.error(f"Account not found for fee processing: {origin_account_number}")
+            return False
+        
+        if not origin_account.active:
+            logger.warning(f"Cannot charge fee for inactive account: {origin_account_number}")
+            return False
+        
+        with transaction.atomic():
+            fee = Fee.objects.create(
+                account=origin_account,
+                amount=fee_amount,
+                type='TRANSFER',
+                description=f'Taxa de transferência - Destino: {destination_account_number}',
+                request_id=f"{request_id}-fee"
+            )
+            
+            # a transport failure raises and rolls the fee back, so a retry charges it again under the same debit id
+            fee_request_id = f"{request_id}-fee-debit"
+            success = AccountApiService.create_movement(
+                origin_account_number,
+                fee_amount,
+                MovementTypes.DEBIT,
+                fee_request_id
+            )
+            
+            if not success:
+                # only charged fees are kept, as in the local batch path, so fee rows and rollups stay in step
+                transaction.set_rollback(True)
+                logger.error(f"Failed to debit fee for account {origin_account_number}")
+                return False
+            
+            TransferStatsService.record_fees([fee])
+            AccountService.refresh_cached_balance(origin_account_number)
+            
+            logger.info(f"Transfer fee processed: {fee.id} for account {origin_account_number}")
+            return True
+    
+    @staticmethod
+    def _charge(fees: list, movements: list, chunk_size: int):
+        # the accounts are locked before the fee rows are written, in the same order every debit path uses
+        with AccountLocks.hold(*{fee.account_id for fee in fees}):
+            Fee.objects.bulk_create(fees, batch_size=chunk_size)
+            LedgerService.post(movements, batch_size=chunk_size)
+            TransferStatsService.record_fees(fees, batch_size=chunk_size)
+            AccountService.refresh_cached_balances(list({fee.account.number for fee in fees}))
+    
     @staticmethod
     def get_fees_by_account_number(account_number: str) -> list:
+        AccountService.validate_account_number(account_number)
+        
         try:
             account = Account.objects.get(number=account_number)
             
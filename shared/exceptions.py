@@ -24,6 +24,9 @@ class ErrorTypes:
     ACCOUNT_NOT_FOUND = "ACCOUNT_NOT_FOUND"
     INVALID_OPERATION = "INVALID_OPERATION"
     INVALID_ARGUMENT = "INVALID_ARGUMENT"
+    REQUEST_IN_PROGRESS = "REQUEST_IN_PROGRESS"
+    ACCOUNT_BUSY = "ACCOUNT_BUSY"
+    TRANSFER_LIMIT_EXCEEDED = "TRANSFER_LIMIT_EXCEEDED"
     INTERNAL_ERROR = "INTERNAL_ERROR"
 
 
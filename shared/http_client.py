@@ -0,0 +1,219 @@
+import logging
+import random
+import threading
+import time
+from typing import Optional, Dict, Any
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from .exceptions import ErrorTypes
+
+logger = logging.getLogger('bankmore')
+
+
+class CircuitOpenError(requests.ConnectionError):
+    pass
+
+
+class CircuitBreaker:
+    CLOSED = 'CLOSED'
+    OPEN = 'OPEN'
+    HALF_OPEN = 'HALF_OPEN'
+    
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+    
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                # let a single probe through; everyone else keeps failing fast until it succeeds
+                self.state = self.HALF_OPEN
+                return True
+            
+            return False
+    
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+    
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"Circuit opened after {self.failures} consecutive failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class InternalHttpClient:
+    def __init__(self, base_url: str, connect_timeout: float, read_timeout: float, max_retries: int,
+                 backoff_base: float, backoff_max: float, pool_size: int, breaker: CircuitBreaker,
+                 in_progress_timeout: float = 30.0, stats_log_interval: float = 0.0):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker
+        self.in_progress_timeout = in_progress_timeout
+        self.stats_log_interval = stats_log_interval
+        
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+        self._stats_logged_at = time.monotonic()
+    
+    def post(self, path: str, json: Optional[Dict[str, Any]] = None) -> requests.Response:
+        return self.request('POST', path, json=json)
+    
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        endpoint = f"{method} {path}"
+        
+        if not self.breaker.allow_request():
+            self._record(endpoint, None, failed=True, rejected=True)
+            raise CircuitOpenError(f"Circuit open for {self.base_url}")
+        
+        attempt = 0
+        failures = 0
+        in_progress_deadline = None
+        while True:
+            if attempt:
+                time.sleep(self._backoff(attempt))
+            attempt += 1
+            
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, f"{self.base_url}{path}", timeout=self.timeout, **kwargs)
+            except requests.RequestException as e:
+                self._record(endpoint, time.monotonic() - started, failed=True, retried=attempt > 1)
+                logger.warning(f"{endpoint} attempt {attempt} failed: {e}")
+                error = e
+                failures += 1
+                if failures > self.max_retries:
+                    break
+                continue
+            
+            elapsed = time.monotonic() - started
+            if response.status_code >= 500:
+                self._record(endpoint, elapsed, failed=True, retried=attempt > 1)
+                logger.warning(f"{endpoint} attempt {attempt} returned {response.status_code}")
+                error = None
+                failures += 1
+                if failures > self.max_retries:
+                    break
+                continue
+            
+            self._record(endpoint, elapsed, retried=attempt > 1)
+            self.breaker.record_success()
+            
+            if self._in_progress(response):
+                # an earlier attempt that timed out on our side is still running on the server; poll
+                # until its stored response is replayed instead of reporting an outcome we do not know
+                if in_progress_deadline is None:
+                    in_progress_deadline = time.monotonic() + self.in_progress_timeout
+                if time.monotonic() < in_progress_deadline:
+                    logger.info(f"{endpoint} attempt {attempt} still in progress, polling")
+                    continue
+                logger.warning(f"{endpoint} still in progress after {self.in_progress_timeout}s")
+            
+            self._log_stats()
+            return response
+        
+        self.breaker.record_failure()
+        self._log_stats()
+        if error is not None:
+            raise error
+        return response
+    
+    def _in_progress(self, response: requests.Response) -> bool:
+        if response.status_code != 409:
+            return False
+        try:
+            return response.json().get('type') == ErrorTypes.REQUEST_IN_PROGRESS
+        except ValueError:
+            return False
+    
+    def _backoff(self, attempt: int) -> float:
+        # full jitter keeps retrying workers from hitting a recovering service in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+    
+    def _record(self, endpoint: str, elapsed: Optional[float], failed: bool = False, retried: bool = False, rejected: bool = False):
+        with self._stats_lock:
+            stats = self._stats.setdefault(endpoint, {
+                'requests': 0,
+                'failures': 0,
+                'retries': 0,
+                'rejected': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+            })
+            stats['requests'] += 1
+            stats['failures'] += failed
+            stats['retries'] += retried
+            stats['rejected'] += rejected
+            if elapsed is not None:
+                elapsed_ms = elapsed * 1000
+                stats['total_ms'] += elapsed_ms
+                stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._stats_lock:
+            snapshot = {}
+            for endpoint, stats in self._stats.items():
+                timed = stats['requests'] - stats['rejected']
+                snapshot[endpoint] = dict(stats, avg_ms=stats['total_ms'] / timed if timed else 0.0)
+            snapshot_state = self.breaker.state
+        
+        return {'circuit': snapshot_state, 'endpoints': snapshot}
+    
+    def _log_stats(self):
+        if not self.stats_log_interval:
+            return
+        
+        with self._stats_lock:
+            now = time.monotonic()
+            if now - self._stats_logged_at < self.stats_log_interval:
+                return
+            self._stats_logged_at = now
+        
+        logger.info(f"Internal HTTP client stats for {self.base_url}: {self.stats()}")
+    
+    def close(self):
+        logger.info(f"Internal HTTP client closed for {self.base_url}: {self.stats()}")
+        self.session.close()
+
+
+def build_client(base_url: str) -> InternalHttpClient:
+    http_settings = settings.INTERNAL_HTTP_SETTINGS
+    return InternalHttpClient(
+        base_url=base_url,
+        connect_timeout=http_settings['CONNECT_TIMEOUT'],
+        read_timeout=http_settings['READ_TIMEOUT'],
+        max_retries=http_settings['MAX_RETRIES'],
+        backoff_base=http_settings['BACKOFF_BASE'],
+        backoff_max=http_settings['BACKOFF_MAX'],
+        pool_size=http_settings['POOL_SIZE'],
+        breaker=CircuitBreaker(
+            failure_threshold=http_settings['BREAKER_FAILURE_THRESHOLD'],
+            reset_timeout=http_settings['BREAKER_RESET_TIMEOUT']
+        ),
+        in_progress_timeout=http_settings['IN_PROGRESS_TIMEOUT'],
+        stats_log_interval=http_settings['STATS_LOG_INTERVAL']
+    )
+
+
+account_api_client = build_client(settings.ACCOUNT_API_BASE_URL)
@@ -0,0 +1,81 @@
+import contextvars
+import logging
+from contextlib import contextmanager
+from typing import Any, Optional
+
+logger = logging.getLogger('bankmore')
+
+_current_map = contextvars.ContextVar('identity_map', default=None)
+
+
+class IdentityMap:
+    def __init__(self):
+        self.objects = {}
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    @contextmanager
+    def scope():
+        identity_map = IdentityMap()
+        token = _current_map.set(identity_map)
+        try:
+            yield identity_map
+        finally:
+            _current_map.reset(token)
+    
+    @staticmethod
+    def current() -> Optional['IdentityMap']:
+        return _current_map.get()
+    
+    @staticmethod
+    def get(model, field: str, value: Any):
+        identity_map = _current_map.get()
+        if identity_map is None:
+            return model.objects.get(**{field: value})
+        
+        key = IdentityMap._key(model, field, value)
+        if key in identity_map.objects:
+            identity_map.hits += 1
+            instance = identity_map.objects[key]
+            if instance is None:
+                raise model.DoesNotExist(f"{model.__name__} matching {field}={value} does not exist.")
+            return instance
+        
+        identity_map.misses += 1
+        try:
+            instance = model.objects.get(**{field: value})
+        except model.DoesNotExist:
+            identity_map.objects[key] = None
+            raise
+        
+        identity_map._register(instance)
+        return instance
+    
+    @staticmethod
+    def evict(model, pk: Any):
+        identity_map = _current_map.get()
+        if identity_map is None:
+            return
+        
+        instance = identity_map.objects.get(IdentityMap._key(model, 'pk', pk))
+        if instance is None:
+            return
+        
+        for field in IdentityMap._unique_fields(model):
+            identity_map.objects.pop(IdentityMap._key(model, field, getattr(instance, field)), None)
+    
+    def _register(self, instance):
+        model = type(instance)
+        for field in IdentityMap._unique_fields(model):
+            self.objects[IdentityMap._key(model, field, getattr(instance, field))] = instance
+    
+    @staticmethod
+    def _unique_fields(model) -> list:
+        return ['pk'] + [field.name for field in model._meta.concrete_fields if field.unique]
+    
+    @staticmethod
+    def _key(model, field: str, value: Any) -> tuple:
+        model_field = model._meta.pk if field in ('pk', model._meta.pk.name) else model._meta.get_field(field)
+        field_name = 'pk' if model_field.primary_key else field
+        return (model._meta.label, field_name, model_field.to_python(value))
@@ -0,0 +1,80 @@
+import logging
+from decimal import Decimal
+from typing import List
+from django.db import models
+from account_api.models import Account, Movement
+from .identity_map import IdentityMap
+from .locks import AccountLocks
+from .utils import MovementTypes, BatchUtils
+from .exceptions import BankMoreException, ErrorTypes
+
+logger = logging.getLogger('bankmore')
+
+
+class LedgerService:
+    @staticmethod
+    def post(movements: List[Movement], batch_size: int = 500) -> List[Movement]:
+        deltas = {}
+        for movement in movements:
+            if movement.amount <= 0:
+                raise ValueError("Amount must be positive")
+            deltas[movement.account_id] = deltas.get(movement.account_id, Decimal('0')) + movement.signed_amount
+        
+        debited_ids = [account_id for account_id, delta in deltas.items() if delta < 0]
+        
+        with AccountLocks.hold(*debited_ids):
+            credits = []
+            for account_id, delta in deltas.items():
+                if delta >= 0:
+                    credits.append((account_id, delta))
+                    continue
+                
+                # the guard and the debit are one statement, so concurrent postings cannot overdraw
+                debited = Account.objects.filter(pk=account_id, balance__gte=-delta).update(
+                    balance=models.F('balance') + delta
+                )
+                if not debited:
+                    raise BankMoreException(
+                        "Saldo insuficiente",
+                        ErrorTypes.INSUFFICIENT_BALANCE
+                    )
+            
+            for chunk in BatchUtils.chunked(credits, batch_size):
+                credited = Account.objects.filter(pk__in=[account_id for account_id, _ in chunk]).update(
+                    balance=models.F('balance') + models.Case(
+                        *[models.When(pk=account_id, then=models.Value(delta)) for account_id, delta in chunk],
+                        output_field=models.DecimalField(max_digits=15, decimal_places=2)
+                    )
+                )
+                if credited != len(chunk):
+                    raise BankMoreException(
+                        "Conta não encontrada",
+                        ErrorTypes.ACCOUNT_NOT_FOUND
+                    )
+            
+            for account_id in deltas:
+                IdentityMap.evict(Account, account_id)
+            
+            Movement.objects.bulk_create(movements, batch_size=batch_size)
+        
+        logger.info(f"Posted {len(movements)} movements to the ledger")
+        return movements
+    
+    @staticmethod
+    def post_transfer(origin_account: Account, destination_account: Account, amount: Decimal, request_id: str) -> List[Movement]:
+        return LedgerService.post([
+            Movement(
+                account=origin_account,
+                amount=amount,
+                type=MovementTypes.DEBIT,
+                description=f"Transferência para conta {destination_account.number}",
+                idempotency_key=f"{request_id}-debit"
+            ),
+            Movement(
+                account=destination_account,
+                amount=amount,
+                type=MovementTypes.CREDIT,
+                description=f"Transferência da conta {origin_account.number}",
+                idempotency_key=f"{request_id}-credit"
+            ),
+        ])
@@ -0,0 +1,112 @@
+import logging
+import threading
+import zlib
+from contextlib import contextmanager, ExitStack
+from typing import Dict
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from account_api.models import Account
+from .exceptions import BankMoreException, ErrorTypes
+
+logger = logging.getLogger('bankmore')
+
+
+class AccountLocks:
+    KEY_PREFIX = 'account_lock:'
+    
+    _stripes = None
+    _stripes_guard = threading.Lock()
+    _held = threading.local()
+    
+    @staticmethod
+    @contextmanager
+    def hold(*account_ids) -> Dict:
+        account_ids = sorted({str(account_id) for account_id in account_ids})
+        backend = AccountLocks.backend()
+        
+        accounts = Account.objects.filter(pk__in=account_ids).order_by('pk')
+        
+        with ExitStack() as stack:
+            if backend == 'database':
+                stack.enter_context(transaction.atomic())
+                accounts = list(accounts.select_for_update())
+            else:
+                held = AccountLocks._held_stripes()
+                # stripes are always taken in ascending order so two callers can never wait on each other;
+                # a stripe this thread already holds is reused, so callers can take the lock around a whole
+                # transaction and still post through the ledger inside it
+                for stripe in sorted({AccountLocks._stripe(account_id) for account_id in account_ids} - held):
+                    stack.enter_context(AccountLocks._acquire(backend, stripe))
+                    held.add(stripe)
+                    stack.callback(held.discard, stripe)
+                
+                # nobody else can debit these accounts now, so they are read before the transaction opens;
+                # it then starts with a write, because SQLite fails a read-to-write upgrade instead of waiting
+                accounts = list(accounts)
+                
+                # entered after the stripes, so the transaction commits before they are released only when it
+                # is the outermost one; inside a caller's transaction it is a savepoint, which is why transfer
+                # paths take the lock before opening theirs and every debit is also a guarded UPDATE
+                stack.enter_context(transaction.atomic())
+            
+            yield {str(account.pk): account for account in accounts}
+    
+    @staticmethod
+    def backend() -> str:
+        backend = settings.ACCOUNT_LOCK_SETTINGS['BACKEND']
+        if backend != 'auto':
+            return backend
+        
+        if connection.features.has_select_for_update:
+            return 'database'
+        if hasattr(cache, 'lock'):
+            return 'redis'
+        return 'local'
+    
+    @staticmethod
+    def _stripe(account_id: str) -> int:
+        return zlib.crc32(account_id.encode()) % settings.ACCOUNT_LOCK_SETTINGS['STRIPES']
+    
+    @staticmethod
+    @contextmanager
+    def _acquire(backend: str, stripe: int):
+        lock_settings = settings.ACCOUNT_LOCK_SETTINGS
+        
+        if backend == 'redis':
+            lock = cache.lock(
+                f"{AccountLocks.KEY_PREFIX}{stripe}",
+                timeout=lock_settings['TIMEOUT'],
+                blocking_timeout=lock_settings['BLOCKING_TIMEOUT']
+            )
+            acquired = lock.acquire()
+        else:
+            lock = AccountLocks._local_stripes()[stripe]
+            acquired = lock.acquire(timeout=lock_settings['BLOCKING_TIMEOUT'])
+        
+        if not acquired:
+            logger.warning(f"Timed out waiting for account lock stripe {stripe}")
+            raise BankMoreException(
+                "Conta em uso por outra operação, tente novamente",
+                ErrorTypes.ACCOUNT_BUSY,
+                status_code=409
+            )
+        
+        try:
+            yield
+        finally:
+            lock.release()
+    
+    @staticmethod
+    def _held_stripes() -> set:
+        if not hasattr(AccountLocks._held, 'stripes'):
+            AccountLocks._held.stripes = set()
+        return AccountLocks._held.stripes
+    
+    @staticmethod
+    def _local_stripes() -> list:
+        if AccountLocks._stripes is None:
+            with AccountLocks._stripes_guard:
+                if AccountLocks._stripes is None:
+                    AccountLocks._stripes = [threading.Lock() for _ in range(settings.ACCOUNT_LOCK_SETTINGS['STRIPES'])]
+        return AccountLocks._stripes
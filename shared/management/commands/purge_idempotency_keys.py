@@ -0,0 +1,11 @@
+from shared.management.purge import PurgeCommand
+from shared.services import IdempotencyService
+
+
+class Command(PurgeCommand):
+    help = 'Delete idempotency keys older than the configured retention in small batches'
+    settings_name = 'IDEMPOTENCY_SETTINGS'
+    label = 'idempotency keys'
+
+    def purge(self, retention_days: int, batch_size: int, pause: float) -> int:
+        return IdempotencyService.purge_expired(retention_days, batch_size, pause=pause)
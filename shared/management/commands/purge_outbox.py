@@ -0,0 +1,11 @@
+from shared.management.purge import PurgeCommand
+from shared.services import OutboxService
+
+
+class Command(PurgeCommand):
+    help = 'Delete outbox messages published before the configured retention in small batches'
+    settings_name = 'OUTBOX_SETTINGS'
+    label = 'outbox messages'
+
+    def purge(self, retention_days: int, batch_size: int, pause: float) -> int:
+        return OutboxService.purge_published(retention_days, batch_size, pause=pause)
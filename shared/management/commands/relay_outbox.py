@@ -0,0 +1,58 @@
+import logging
+import time
+from django.core.management.base import BaseCommand
+from shared.services import OutboxService
+
+logger = logging.getLogger('bankmore')
+
+
+class Command(BaseCommand):
+    help = 'Publish pending outbox messages to Kafka in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Messages read and published per round trip'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0.5,
+            help='Seconds to wait when the outbox is empty'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the outbox once and exit'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('Starting outbox relay'))
+        
+        relayed = 0
+        try:
+            while True:
+                try:
+                    published = OutboxService.relay(options['batch_size'])
+                except Exception as e:
+                    self.stdout.write(self.style.ERROR(f'Error relaying outbox messages: {e}'))
+                    if options['once']:
+                        break
+                    time.sleep(options['interval'])
+                    continue
+                
+                relayed += published
+                if published:
+                    logger.info(f"Relayed {published} outbox messages")
+                    continue
+                
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+                
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Stopping outbox relay...'))
+        
+        self.stdout.write(self.style.SUCCESS(f'Outbox relay stopped after publishing {relayed} messages'))
@@ -0,0 +1,47 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class PurgeCommand(BaseCommand):
+    settings_name = None
+    label = None
+
+    def add_arguments(self, parser):
+        purge_settings = getattr(settings, self.settings_name)
+        parser.add_argument(
+            '--retention-days',
+            type=int,
+            default=purge_settings['RETENTION_DAYS'],
+            help=f'{self.label.capitalize()} older than this many days are deleted'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=purge_settings['PURGE_BATCH_SIZE'],
+            help='Number of rows deleted per statement'
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0,
+            help='Seconds to sleep between batches'
+        )
+
+    def handle(self, *args, **options):
+        if options['retention_days'] < 1:
+            raise CommandError('Retention must be at least one day')
+        
+        if options['batch_size'] < 1:
+            raise CommandError('Batch size must be positive')
+        
+        started = time.monotonic()
+        deleted = self.purge(options['retention_days'], options['batch_size'], options['pause'])
+        elapsed = time.monotonic() - started
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'Deleted {deleted} {self.label} in {elapsed:.2f}s')
+        )
+
+    def purge(self, retention_days: int, batch_size: int, pause: float) -> int:
+        raise NotImplementedError
@@ -1,8 +1,10 @@
 import logging
 import json
+from django.conf import settings
 from django.http import JsonResponse
 from django.utils.deprecation import MiddlewareMixin
 from .exceptions import BankMoreException, ErrorTypes
+from .identity_map import IdentityMap
 
 logger = logging.getLogger('bankmore')
 
@@ -31,3 +33,20 @@ class RequestLoggingMiddleware(MiddlewareMixin):
     def process_response(self, request, response):
         logger.info(f"Response: {request.method} {request.path} - {response.status_code}")
         return response
+
+
+class IdentityMapMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        with IdentityMap.scope() as identity_map:
+            response = self.get_response(request)
+        
+        if identity_map.hits:
+            logger.debug(f"Identity map: {identity_map.hits} queries saved, {identity_map.misses} loaded - {request.method} {request.path}")
+        
+        if settings.DEBUG:
+            response['X-Identity-Map-Saved-Queries'] = str(identity_map.hits)
+        
+        return response
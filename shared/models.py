@@ -21,6 +21,41 @@ class IdempotencyKey(BaseModel):
         db_table = 'idempotencia'
         verbose_name = 'Chave de Idempotência'
         verbose_name_plural = 'Chaves de Idempotência'
+        indexes = [
+            models.Index(fields=['created_at']),
+        ]
 
     def __str__(self):
         return f"IdempotencyKey: {self.key}"
+
+
+class NumberSequence(BaseModel):
+    name = models.CharField(max_length=100, unique=True)
+    next_value = models.BigIntegerField()
+    
+    class Meta:
+        db_table = 'sequencia'
+        verbose_name = 'Sequência'
+        verbose_name_plural = 'Sequências'
+
+    def __str__(self):
+        return f"NumberSequence: {self.name} ({self.next_value})"
+
+
+class OutboxMessage(BaseModel):
+    topic = models.CharField(max_length=100)
+    key = models.CharField(max_length=255, null=True, blank=True)
+    payload = models.TextField()
+    published_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.IntegerField(default=0)
+    
+    class Meta:
+        db_table = 'outbox'
+        verbose_name = 'Mensagem de Saída'
+        verbose_name_plural = 'Mensagens de Saída'
+        indexes = [
+            models.Index(fields=['published_at', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"OutboxMessage: {self.topic} ({self.key})"
@@ -0,0 +1,11 @@
+from rest_framework.renderers import JSONRenderer
+
+
+class CSVStreamRenderer(JSONRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class NDJSONStreamRenderer(JSONRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
@@ -0,0 +1,57 @@
+import logging
+import os
+import threading
+from django.db import IntegrityError, models, transaction
+from .models import NumberSequence
+
+logger = logging.getLogger('bankmore')
+
+
+class NumberBlockAllocator:
+    def __init__(self, name: str, start: int, block_size: int):
+        self.name = name
+        self.start = start
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._pid = None
+        self._next = 0
+        self._end = 0
+    
+    def allocate(self) -> int:
+        with self._lock:
+            if self._pid == os.getpid() and self._next < self._end:
+                value = self._next
+                self._next += 1
+                return value
+        
+        with transaction.atomic():
+            block_start, block_end = self._reserve_block()
+            # a block reserved inside a caller's transaction only becomes reusable once that transaction commits
+            transaction.on_commit(lambda: self._adopt(block_start + 1, block_end))
+        
+        return block_start
+    
+    def _reserve_block(self) -> tuple:
+        if not NumberSequence.objects.filter(name=self.name).exists():
+            try:
+                with transaction.atomic():
+                    NumberSequence.objects.create(name=self.name, next_value=self.start)
+            except IntegrityError:
+                pass
+        
+        NumberSequence.objects.filter(name=self.name).update(
+            next_value=models.F('next_value') + self.block_size
+        )
+        block_end = NumberSequence.objects.filter(name=self.name).values_list('next_value', flat=True).get()
+        
+        logger.info(f"Reserved {self.name} block [{block_end - self.block_size}, {block_end}) for process {os.getpid()}")
+        return block_end - self.block_size, block_end
+    
+    def _adopt(self, block_next: int, block_end: int):
+        with self._lock:
+            if self._pid == os.getpid() and self._next < self._end:
+                return
+            
+            self._pid = os.getpid()
+            self._next = block_next
+            self._end = block_end
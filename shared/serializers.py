@@ -0,0 +1,57 @@
+from rest_framework import serializers
+from .utils import KeysetCursor, AccountNumberGenerator
+from .exceptions import BankMoreException, ErrorTypes
+
+
+class KeysetCursorField(serializers.CharField):
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+        try:
+            KeysetCursor.decode(value)
+        except ValueError:
+            raise BankMoreException(
+                "Cursor inválido",
+                ErrorTypes.INVALID_ARGUMENT
+            )
+        return value
+
+
+class AccountNumberField(serializers.CharField):
+    def __init__(self, **kwargs):
+        kwargs.setdefault('max_length', 10)
+        super().__init__(**kwargs)
+    
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+        # a mistyped number fails its check digit here, before any filter or database lookup
+        if not AccountNumberGenerator.is_valid(value):
+            raise BankMoreException(
+                "Número de conta inválido",
+                ErrorTypes.INVALID_ACCOUNT
+            )
+        return value
+
+
+class ItemErrorSerializer(serializers.Serializer):
+    message = serializers.CharField()
+    type = serializers.CharField()
+
+
+def validate_batch_items(items: list, item_serializer_class) -> list:
+    # every item is validated on its own, so one bad item is reported instead of failing the whole batch
+    entries = []
+    for item in items:
+        entry = {'request_id': item.get('request_id'), 'data': None, 'error': None}
+        item_serializer = item_serializer_class(data=item)
+        
+        try:
+            if item_serializer.is_valid():
+                entry['data'] = item_serializer.validated_data
+            else:
+                field, errors = next(iter(item_serializer.errors.items()))
+                entry['error'] = {'message': f"{field}: {errors[0]}", 'type': ErrorTypes.INVALID_ARGUMENT}
+        except BankMoreException as e:
+            entry['error'] = {'message': e.message, 'type': e.error_type}
+        
+        entries.append(entry)
+    return entries
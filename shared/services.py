@@ -1,18 +1,31 @@
+import atexit
+import csv
 import json
 import logging
-from typing import Optional, Dict, Any
+import math
+import random
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, Callable, List, Iterable
 from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, models, transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from kafka import KafkaProducer
+from kafka.errors import KafkaError, KafkaTimeoutError
 from django.conf import settings
-from .models import IdempotencyKey
+from .models import IdempotencyKey, OutboxMessage
+from .utils import BatchUtils
 from .exceptions import BankMoreException, ErrorTypes
 
 logger = logging.getLogger('bankmore')
 
 
-class IdempotencyService:
-    @staticmethod
-    def check_idempotency(key: str, request_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+class DatabaseIdempotencyBackend:
+    def check_idempotency(self, key: str, request_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         try:
             idempotency_record = IdempotencyKey.objects.get(key=key)
             
@@ -24,20 +37,296 @@ class IdempotencyService:
         except IdempotencyKey.DoesNotExist:
             IdempotencyKey.objects.create(
                 key=key,
-                request_data=json.dumps(request_data),
+                request_data=json.dumps(request_data, cls=DjangoJSONEncoder),
                 status='PENDING'
             )
             return None
     
-    @staticmethod
-    def save_response(key: str, response_data: Dict[str, Any]):
+    def save_response(self, key: str, response_data: Dict[str, Any]):
         try:
             idempotency_record = IdempotencyKey.objects.get(key=key)
-            idempotency_record.response_data = json.dumps(response_data)
+            idempotency_record.response_data = json.dumps(response_data, cls=DjangoJSONEncoder)
             idempotency_record.status = 'COMPLETED'
             idempotency_record.save()
         except IdempotencyKey.DoesNotExist:
             logger.error(f"Idempotency key not found: {key}")
+    
+    def check_idempotency_many(self, requests: Dict[str, Dict[str, Any]]) -> Dict[str, Optional[Dict[str, Any]]]:
+        records = IdempotencyKey.objects.filter(key__in=list(requests)).only('key', 'status', 'response_data')
+        
+        cached_responses = {}
+        known_keys = set()
+        for record in records:
+            known_keys.add(record.key)
+            if record.status == 'COMPLETED' and record.response_data:
+                cached_responses[record.key] = json.loads(record.response_data)
+        
+        IdempotencyKey.objects.bulk_create([
+            IdempotencyKey(key=key, request_data=json.dumps(request_data, cls=DjangoJSONEncoder), status='PENDING')
+            for key, request_data in requests.items() if key not in known_keys
+        ], batch_size=500, ignore_conflicts=True)
+        
+        return cached_responses
+    
+    def save_responses(self, responses: Dict[str, Dict[str, Any]]):
+        records = list(IdempotencyKey.objects.filter(key__in=list(responses)))
+        now = timezone.now()
+        
+        for record in records:
+            record.response_data = json.dumps(responses[record.key], cls=DjangoJSONEncoder)
+            record.status = 'COMPLETED'
+            record.updated_at = now
+        
+        IdempotencyKey.objects.bulk_update(records, ['response_data', 'status', 'updated_at'], batch_size=500)
+        
+        if len(records) != len(responses):
+            logger.error(f"Idempotency keys not found: {set(responses) - {record.key for record in records}}")
+    
+    def release_many(self, keys: List[str]):
+        # a PENDING row never short-circuits a retry, so there is nothing to undo
+        pass
+    
+    def keep_alive(self, keys: List[str]):
+        # claims are rows that never expire, so there is nothing to refresh
+        return nullcontext()
+
+
+class RedisIdempotencyBackend:
+    KEY_PREFIX = 'idempotency:'
+    PENDING = 'PENDING'
+    COMPLETED = 'COMPLETED'
+    
+    # only a claim that is still pending may be dropped, never a stored response
+    RELEASE_SCRIPT = """
+        local value = redis.call('GET', KEYS[1])
+        if value and cjson.decode(value)['status'] == ARGV[1] then
+            return redis.call('DEL', KEYS[1])
+        end
+        return 0
+    """
+    
+    # extends a claim only while it is still pending, so a stored response keeps its own TTL
+    REFRESH_SCRIPT = """
+        local value = redis.call('GET', KEYS[1])
+        if value and cjson.decode(value)['status'] == ARGV[1] then
+            return redis.call('EXPIRE', KEYS[1], ARGV[2])
+        end
+        return 0
+    """
+    
+    def __init__(self, ttl: int, claim_ttl: int, durable: bool):
+        self.ttl = ttl
+        self.claim_ttl = claim_ttl
+        self.durable = durable
+        self._held = {}
+        self._held_lock = threading.Lock()
+        self._keeper = None
+    
+    @property
+    def redis(self):
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+    
+    def check_idempotency(self, key: str, request_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        claim = json.dumps({'status': self.PENDING, 'request': request_data}, cls=DjangoJSONEncoder)
+        if self.redis.set(self._key(key), claim, nx=True, ex=self.claim_ttl):
+            return None
+        
+        return self._existing_response(key, self.redis.get(self._key(key)))
+    
+    def save_response(self, key: str, response_data: Dict[str, Any]):
+        self.save_responses({key: response_data})
+    
+    def check_idempotency_many(self, requests: Dict[str, Dict[str, Any]]) -> Dict[str, Optional[Dict[str, Any]]]:
+        keys = list(requests)
+        
+        pipeline = self.redis.pipeline(transaction=False)
+        for key in keys:
+            claim = json.dumps({'status': self.PENDING, 'request': requests[key]}, cls=DjangoJSONEncoder)
+            pipeline.set(self._key(key), claim, nx=True, ex=self.claim_ttl)
+        claimed = pipeline.execute()
+        
+        taken = [key for key, was_claimed in zip(keys, claimed) if not was_claimed]
+        if not taken:
+            return {}
+        
+        cached_responses = {}
+        for key, value in zip(taken, self.redis.mget([self._key(key) for key in taken])):
+            entry = json.loads(value) if value else {}
+            # an in-flight duplicate must not be applied twice either, so it is reported without a response
+            cached_responses[key] = entry.get('response') if entry.get('status') == self.COMPLETED else None
+        
+        return cached_responses
+    
+    def save_responses(self, responses: Dict[str, Dict[str, Any]]):
+        values = {
+            self._key(key): json.dumps({'status': self.COMPLETED, 'response': response_data}, cls=DjangoJSONEncoder)
+            for key, response_data in responses.items()
+        }
+        transaction.on_commit(lambda: self._store(values, responses))
+    
+    def _store(self, values: Dict[str, str], responses: Dict[str, Dict[str, Any]]):
+        # runs after the commit, so it must never raise: an error here would reach release_on_error, which
+        # would drop the claim of a request that was already applied and let a retry apply it again
+        try:
+            pipeline = self.redis.pipeline(transaction=False)
+            for key, value in values.items():
+                # the claim being replaced carries the request, which the durable copy keeps
+                pipeline.get(key)
+                pipeline.set(key, value, ex=self.ttl)
+            claims = pipeline.execute()[::2]
+        except Exception as e:
+            logger.error(f"Failed to store idempotency responses for {len(values)} committed requests: {e}")
+            claims = []
+        
+        if self.durable:
+            self._write_behind(responses, dict(zip(responses, claims)))
+    
+    def release_many(self, keys: List[str]):
+        release = self.redis.register_script(self.RELEASE_SCRIPT)
+        pipeline = self.redis.pipeline(transaction=False)
+        for key in keys:
+            release(keys=[self._key(key)], args=[self.PENDING], client=pipeline)
+        pipeline.execute()
+    
+    @contextmanager
+    def keep_alive(self, keys: List[str]):
+        with self._held_lock:
+            for key in keys:
+                self._held[key] = self._held.get(key, 0) + 1
+            if self._keeper is None or not self._keeper.is_alive():
+                self._keeper = threading.Thread(target=self._refresh_claims, name='idempotency-claims', daemon=True)
+                self._keeper.start()
+        
+        try:
+            yield
+        finally:
+            with self._held_lock:
+                for key in keys:
+                    self._held[key] -= 1
+                    if not self._held[key]:
+                        del self._held[key]
+    
+    def _refresh_claims(self):
+        # a slow request keeps its claim without a long claim TTL, which would block retries after a crash
+        interval = max(self.claim_ttl / 3, 1)
+        while True:
+            time.sleep(interval)
+            with self._held_lock:
+                keys = list(self._held)
+            if not keys:
+                continue
+            
+            try:
+                refresh = self.redis.register_script(self.REFRESH_SCRIPT)
+                pipeline = self.redis.pipeline(transaction=False)
+                for key in keys:
+                    refresh(keys=[self._key(key)], args=[self.PENDING, self.claim_ttl], client=pipeline)
+                pipeline.execute()
+            except Exception as e:
+                logger.warning(f"Failed to refresh {len(keys)} idempotency claims: {e}")
+    
+    def _existing_response(self, key: str, value) -> Optional[Dict[str, Any]]:
+        entry = json.loads(value) if value else {}
+        
+        if entry.get('status') == self.COMPLETED:
+            logger.info(f"Returning cached response for idempotency key: {key}")
+            return entry['response']
+        
+        raise BankMoreException(
+            "Requisição já está em processamento",
+            ErrorTypes.REQUEST_IN_PROGRESS,
+            status_code=409
+        )
+    
+    def _write_behind(self, responses: Dict[str, Dict[str, Any]], claims: Dict[str, Any]):
+        now = timezone.now()
+        try:
+            IdempotencyKey.objects.bulk_create([
+                IdempotencyKey(
+                    key=key,
+                    request_data=self._request_data(claims.get(key)),
+                    response_data=json.dumps(response_data, cls=DjangoJSONEncoder),
+                    status=self.COMPLETED,
+                    updated_at=now
+                )
+                for key, response_data in responses.items()
+            ], batch_size=500, update_conflicts=True, unique_fields=['key'], update_fields=['response_data', 'status', 'updated_at'])
+        except Exception as e:
+            logger.error(f"Failed to persist idempotency responses: {e}")
+    
+    def _request_data(self, claim) -> str:
+        entry = json.loads(claim) if claim else {}
+        if entry.get('status') != self.PENDING:
+            return ''
+        return json.dumps(entry.get('request'), cls=DjangoJSONEncoder)
+    
+    def _key(self, key: str) -> str:
+        return f"{self.KEY_PREFIX}{key}"
+
+
+class IdempotencyService:
+    _backend = None
+    
+    @staticmethod
+    def backend():
+        if IdempotencyService._backend is None:
+            idempotency_settings = settings.IDEMPOTENCY_SETTINGS
+            if idempotency_settings['BACKEND'] == 'redis':
+                IdempotencyService._backend = RedisIdempotencyBackend(
+                    ttl=idempotency_settings['TTL'],
+                    claim_ttl=idempotency_settings['CLAIM_TTL'],
+                    durable=idempotency_settings['DURABLE_WRITE_BEHIND']
+                )
+            else:
+                IdempotencyService._backend = DatabaseIdempotencyBackend()
+        return IdempotencyService._backend
+    
+    @staticmethod
+    def check_idempotency(key: str, request_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return IdempotencyService.backend().check_idempotency(key, request_data)
+    
+    @staticmethod
+    def save_response(key: str, response_data: Dict[str, Any]):
+        IdempotencyService.backend().save_response(key, response_data)
+    
+    @staticmethod
+    def check_idempotency_many(requests: Dict[str, Dict[str, Any]]) -> Dict[str, Optional[Dict[str, Any]]]:
+        return IdempotencyService.backend().check_idempotency_many(requests)
+    
+    @staticmethod
+    def save_responses(responses: Dict[str, Dict[str, Any]]):
+        IdempotencyService.backend().save_responses(responses)
+    
+    @staticmethod
+    def release_many(keys: List[str]):
+        if keys:
+            IdempotencyService.backend().release_many(keys)
+    
+    @staticmethod
+    @contextmanager
+    def release_on_error(*keys: str):
+        # the claims are also kept alive for as long as the block runs, however long that takes; a stored
+        # response is never released, and storing it after the commit does not raise, so only requests that
+        # failed before committing give their claims back
+        try:
+            with IdempotencyService.backend().keep_alive(list(keys)):
+                yield
+        except Exception:
+            try:
+                IdempotencyService.release_many(list(keys))
+            except Exception as e:
+                logger.error(f"Failed to release idempotency claims: {e}")
+            raise
+    
+    @staticmethod
+    def purge_expired(retention_days: int, batch_size: int, pause: float = 0) -> int:
+        cutoff = timezone.now() - timedelta(days=retention_days)
+        expired = IdempotencyKey.objects.filter(created_at__lt=cutoff).order_by('created_at')
+        deleted = BatchUtils.delete_in_batches(expired, batch_size, pause=pause)
+        
+        logger.info(f"Purged {deleted} idempotency keys created before {cutoff.isoformat()}")
+        return deleted
 
 
 class CacheService:
@@ -53,24 +342,225 @@ class CacheService:
     def delete(key: str):
         cache.delete(key)
     
+    @staticmethod
+    def get_or_refresh(key: str, loader: Callable[[], Any], timeout: int = 300, lock_timeout: int = 5, beta: float = 1.0) -> Any:
+        entry = cache.get(key)
+        
+        if entry is not None and not CacheService._should_refresh_early(entry, beta):
+            return entry['value']
+        
+        lock_key = f"{key}:lock"
+        if cache.add(lock_key, 1, lock_timeout):
+            try:
+                return CacheService._recompute(key, loader, timeout)
+            finally:
+                cache.delete(lock_key)
+        
+        if entry is not None:
+            return entry['value']
+        
+        deadline = time.monotonic() + lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            entry = cache.get(key)
+            if entry is not None:
+                return entry['value']
+        
+        logger.warning(f"Timed out waiting for cache recomputation: {key}")
+        return loader()
+    
+    @staticmethod
+    def get_many(keys: List[str]) -> Dict[str, Any]:
+        return {key: entry['value'] for key, entry in cache.get_many(keys).items()}
+    
+    @staticmethod
+    def set_many(values: Dict[str, Any], timeout: int = 300):
+        expires_at = time.time() + timeout
+        cache.set_many({
+            key: {'value': value, 'compute_time': 0.0, 'expires_at': expires_at}
+            for key, value in values.items()
+        }, timeout)
+    
+    @staticmethod
+    def write_through(key: str, loader: Callable[[], Any], timeout: int = 300):
+        def refresh():
+            if CacheService._recompute(key, loader, timeout) is None:
+                cache.delete(key)
+        
+        transaction.on_commit(refresh)
+    
+    @staticmethod
+    def _recompute(key: str, loader: Callable[[], Any], timeout: int) -> Any:
+        started = time.monotonic()
+        value = loader()
+        CacheService._store(key, value, timeout, time.monotonic() - started)
+        return value
+    
+    @staticmethod
+    def _store(key: str, value: Any, timeout: int, compute_time: float):
+        cache.set(key, {
+            'value': value,
+            'compute_time': compute_time,
+            'expires_at': time.time() + timeout
+        }, timeout)
+    
+    @staticmethod
+    def _should_refresh_early(entry: Dict[str, Any], beta: float) -> bool:
+        # XFetch: the closer to expiry and the slower the loader, the likelier a refresh
+        jitter = -entry['compute_time'] * beta * math.log(1.0 - random.random())
+        return time.time() + jitter >= entry['expires_at']
+    
     @staticmethod
     def get_account_balance_key(account_number: str) -> str:
         return f"account_balance:{account_number}"
+    
+    @staticmethod
+    def get_transfer_detail_key(transfer_id: str) -> str:
+        return f"transfer_detail:{transfer_id}"
+
+
+class ExportService:
+    CSV = 'csv'
+    NDJSON = 'ndjson'
+    
+    CONTENT_TYPES = {
+        CSV: 'text/csv; charset=utf-8',
+        NDJSON: 'application/x-ndjson; charset=utf-8',
+    }
+    
+    class _Echo:
+        def write(self, value):
+            return value
+    
+    @staticmethod
+    def stream(rows: Iterable[Dict[str, Any]], fields: List[str], export_format: str, filename: str) -> StreamingHttpResponse:
+        if export_format == ExportService.NDJSON:
+            content = ExportService._ndjson_lines(rows, fields)
+        else:
+            export_format = ExportService.CSV
+            content = ExportService._csv_lines(rows, fields)
+        
+        response = StreamingHttpResponse(content, content_type=ExportService.CONTENT_TYPES[export_format])
+        response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+        return response
+    
+    @staticmethod
+    def _csv_lines(rows: Iterable[Dict[str, Any]], fields: List[str]):
+        writer = csv.writer(ExportService._Echo())
+        yield writer.writerow(fields)
+        for row in rows:
+            yield writer.writerow([ExportService._csv_value(row[field]) for field in fields])
+    
+    @staticmethod
+    def _ndjson_lines(rows: Iterable[Dict[str, Any]], fields: List[str]):
+        for row in rows:
+            yield json.dumps({field: row[field] for field in fields}, cls=DjangoJSONEncoder) + '\n'
+    
+    @staticmethod
+    def _csv_value(value):
+        if value is None:
+            return ''
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+
+class OutboxService:
+    @staticmethod
+    def enqueue(topic: str, payload: Dict[str, Any], key: Optional[str] = None):
+        OutboxMessage.objects.create(topic=topic, key=key, payload=json.dumps(payload, cls=DjangoJSONEncoder))
+    
+    @staticmethod
+    def enqueue_many(topic: str, payloads: List[Dict[str, Any]], key_field: Optional[str] = None, batch_size: int = 500):
+        OutboxMessage.objects.bulk_create([
+            OutboxMessage(
+                topic=topic,
+                key=str(payload.get(key_field)) if key_field else None,
+                payload=json.dumps(payload, cls=DjangoJSONEncoder)
+            )
+            for payload in payloads
+        ], batch_size=batch_size)
+    
+    @staticmethod
+    def enqueue_transfers_completed(transfers_data: List[Dict[str, Any]]):
+        topic = settings.KAFKA_SETTINGS['TOPICS']['TRANSFERS_COMPLETED']
+        OutboxService.enqueue_many(topic, transfers_data, key_field='id')
+    
+    @staticmethod
+    def relay(batch_size: int) -> int:
+        # with SKIP LOCKED several relays can run side by side, each holding its batch until it is marked published;
+        # databases without it (SQLite) must run a single relay, or the same messages would be published twice
+        skip_locked = connection.features.has_select_for_update_skip_locked
+        
+        with transaction.atomic() if skip_locked else nullcontext():
+            pending = OutboxMessage.objects.filter(published_at__isnull=True).order_by('created_at', 'id')
+            if skip_locked:
+                pending = pending.select_for_update(skip_locked=True)
+            
+            messages = list(pending[:batch_size])
+            if not messages:
+                return 0
+            
+            message_ids = [message.pk for message in messages]
+            try:
+                kafka_service.publish([
+                    (message.topic, message.key, json.loads(message.payload))
+                    for message in messages
+                ])
+                error = None
+            except Exception as e:
+                OutboxMessage.objects.filter(pk__in=message_ids).update(attempts=models.F('attempts') + 1)
+                error = e
+            else:
+                OutboxMessage.objects.filter(pk__in=message_ids).update(published_at=timezone.now())
+        
+        if error is not None:
+            logger.error(f"Failed to relay {len(messages)} outbox messages: {error}")
+            raise error
+        return len(messages)
+    
+    @staticmethod
+    def purge_published(retention_days: int, batch_size: int, pause: float = 0) -> int:
+        cutoff = timezone.now() - timedelta(days=retention_days)
+        published = OutboxMessage.objects.filter(published_at__lt=cutoff).order_by('published_at')
+        deleted = BatchUtils.delete_in_batches(published, batch_size, pause=pause)
+        
+        logger.info(f"Purged {deleted} outbox messages published before {cutoff.isoformat()}")
+        return deleted
 
 
 class KafkaService:
     def __init__(self):
         self.producer = None
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'messages_sent': 0,
+            'bytes_sent': 0,
+            'failures': 0,
+            'total_latency_ms': 0.0,
+            'max_latency_ms': 0.0,
+        }
         self._initialize_producer()
     
     def _initialize_producer(self):
         try:
             kafka_settings = settings.KAFKA_SETTINGS
+            producer_settings = kafka_settings['PRODUCER']
+            self.blocking = producer_settings['BLOCKING']
+            self.send_timeout = producer_settings['SEND_TIMEOUT']
             self.producer = KafkaProducer(
                 bootstrap_servers=kafka_settings['BOOTSTRAP_SERVERS'],
-                value_serializer=lambda v: json.dumps(v).encode('utf-8'),
-                key_serializer=lambda k: k.encode('utf-8') if k else None
+                value_serializer=lambda v: json.dumps(v, cls=DjangoJSONEncoder).encode('utf-8'),
+                key_serializer=lambda k: k.encode('utf-8') if k else None,
+                acks=producer_settings['ACKS'] if producer_settings['ACKS'] == 'all' else int(producer_settings['ACKS']),
+                linger_ms=producer_settings['LINGER_MS'],
+                batch_size=producer_settings['BATCH_SIZE'],
+                compression_type=producer_settings['COMPRESSION'] or None,
+                # a full buffer makes send() wait at most max_block_ms and then fail, instead of growing without bound
+                buffer_memory=producer_settings['BUFFER_MEMORY'],
+                max_block_ms=producer_settings['MAX_BLOCK_MS']
             )
+            atexit.register(self.close)
         except Exception as e:
             logger.error(f"Failed to initialize Kafka producer: {e}")
     
@@ -79,12 +569,73 @@ class KafkaService:
             logger.error("Kafka producer not initialized")
             return
         
+        started = time.monotonic()
         try:
             future = self.producer.send(topic, value=message, key=key)
-            future.get(timeout=10)
-            logger.info(f"Message sent to topic {topic}: {message}")
         except Exception as e:
-            logger.error(f"Failed to send message to Kafka: {e}")
+            self._record_failure(topic, e)
+            return
+        
+        future.add_callback(self._on_delivered, started)
+        future.add_errback(lambda e: self._record_failure(topic, e))
+        
+        if self.blocking:
+            try:
+                future.get(timeout=self.send_timeout)
+                logger.info(f"Message sent to topic {topic}: {message}")
+            except KafkaTimeoutError:
+                # the future is still pending, so the errback has not fired and may never do so before we return
+                logger.warning(f"Timed out after {self.send_timeout}s waiting for Kafka topic {topic} to acknowledge message")
+            except KafkaError:
+                # delivery failures resolve the future through the errback, which already counted and logged them
+                return
+    
+    def _on_delivered(self, started: float, record_metadata):
+        latency_ms = (time.monotonic() - started) * 1000
+        size = max(record_metadata.serialized_key_size, 0) + max(record_metadata.serialized_value_size, 0)
+        
+        with self._stats_lock:
+            self._stats['messages_sent'] += 1
+            self._stats['bytes_sent'] += size
+            self._stats['total_latency_ms'] += latency_ms
+            self._stats['max_latency_ms'] = max(self._stats['max_latency_ms'], latency_ms)
+    
+    def _record_failure(self, topic: str, error: Exception):
+        with self._stats_lock:
+            self._stats['failures'] += 1
+        logger.error(f"Failed to send message to Kafka topic {topic}: {error}")
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        
+        stats['avg_latency_ms'] = stats['total_latency_ms'] / stats['messages_sent'] if stats['messages_sent'] else 0.0
+        
+        if self.producer:
+            producer_metrics = self.producer.metrics().get('producer-metrics', {})
+            stats['batch_size_avg'] = producer_metrics.get('batch-size-avg', 0.0)
+            stats['batch_size_max'] = producer_metrics.get('batch-size-max', 0.0)
+            stats['records_per_request_avg'] = producer_metrics.get('records-per-request-avg', 0.0)
+            stats['compression_rate_avg'] = producer_metrics.get('compression-rate-avg', 0.0)
+            stats['buffer_available_bytes'] = producer_metrics.get('buffer-available-bytes', 0.0)
+        
+        return stats
+    
+    def publish(self, records: List[tuple], timeout: int = 30):
+        if not self.producer:
+            raise RuntimeError("Kafka producer not initialized")
+        
+        started = time.monotonic()
+        futures = []
+        for topic, key, value in records:
+            future = self.producer.send(topic, value=value, key=key)
+            future.add_callback(self._on_delivered, started)
+            future.add_errback(lambda e, topic=topic: self._record_failure(topic, e))
+            futures.append(future)
+        # one flush for the whole batch instead of waiting on every future
+        self.producer.flush(timeout=timeout)
+        for future in futures:
+            future.get(timeout=0)
     
     def send_transfer_completed(self, transfer_data: Dict[str, Any]):
         kafka_settings = settings.KAFKA_SETTINGS
@@ -98,7 +649,13 @@ class KafkaService:
     
     def close(self):
         if self.producer:
-            self.producer.close()
+            producer, self.producer = self.producer, None
+            try:
+                producer.flush(timeout=self.send_timeout)
+            except Exception as e:
+                logger.error(f"Failed to flush Kafka producer on shutdown: {e}")
+            producer.close(timeout=self.send_timeout)
+            logger.info(f"Kafka producer closed: {self.stats()}")
 
 
 kafka_service = KafkaService()
@@ -0,0 +1,21 @@
+from django.conf import settings
+from bankmore_project.celery import app
+from .services import IdempotencyService, OutboxService
+
+
+@app.task
+def purge_idempotency_keys():
+    idempotency_settings = settings.IDEMPOTENCY_SETTINGS
+    return IdempotencyService.purge_expired(
+        idempotency_settings['RETENTION_DAYS'],
+        idempotency_settings['PURGE_BATCH_SIZE']
+    )
+
+
+@app.task
+def purge_outbox_messages():
+    outbox_settings = settings.OUTBOX_SETTINGS
+    return OutboxService.purge_published(
+        outbox_settings['RETENTION_DAYS'],
+        outbox_settings['PURGE_BATCH_SIZE']
+    )
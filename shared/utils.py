@@ -1,7 +1,14 @@
+import base64
 import hashlib
+import math
 import secrets
 import re
+import uuid
+from datetime import date, datetime, time, timedelta
 from decimal import Decimal
+from itertools import islice
+from time import sleep
+from django.utils import timezone
 
 
 class CPFValidator:
@@ -32,14 +39,14 @@ class CPFValidator:
             return False
         
         return True
-
+    
     @staticmethod
     def format(cpf: str) -> str:
         cpf = re.sub(r'[^0-9]', '', cpf)
         if len(cpf) == 11:
             return f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"
         return cpf
-
+    
     @staticmethod
     def clean(cpf: str) -> str:
         return re.sub(r'[^0-9]', '', cpf) if cpf else ""
@@ -60,9 +67,32 @@ class PasswordHasher:
 
 
 class AccountNumberGenerator:
+    # numbers issued before the allocator are random six digit values without a check digit
+    LEGACY_LENGTH = 6
+    
     @staticmethod
-    def generate() -> str:
-        return str(secrets.randbelow(900000) + 100000)
+    def check_digit(base: int) -> int:
+        total = 0
+        for index, digit in enumerate(reversed(str(base))):
+            value = int(digit)
+            if index % 2 == 0:
+                value *= 2
+                if value > 9:
+                    value -= 9
+            total += value
+        return (10 - total % 10) % 10
+    
+    @staticmethod
+    def format(base: int) -> str:
+        return f"{base}{AccountNumberGenerator.check_digit(base)}"
+    
+    @staticmethod
+    def is_valid(number: str) -> bool:
+        if not number or not number.isdigit() or len(number) < 2:
+            return False
+        if len(number) == AccountNumberGenerator.LEGACY_LENGTH:
+            return True
+        return AccountNumberGenerator.check_digit(int(number[:-1])) == int(number[-1])
 
 
 class MoneyUtils:
@@ -83,6 +113,85 @@ class MoneyUtils:
         return Decimal(str(amount))
 
 
+class BatchUtils:
+    @staticmethod
+    def chunked(iterable, size: int):
+        iterator = iter(iterable)
+        while True:
+            chunk = list(islice(iterator, size))
+            if not chunk:
+                return
+            yield chunk
+    
+    @staticmethod
+    def delete_in_batches(queryset, batch_size: int, pause: float = 0) -> int:
+        deleted = 0
+        while True:
+            # small separate deletes keep each write lock short so live requests are not blocked
+            batch = list(queryset.values_list('pk', flat=True)[:batch_size])
+            if not batch:
+                return deleted
+            
+            count, _ = queryset.model.objects.filter(pk__in=batch).delete()
+            deleted += count
+            
+            if pause:
+                sleep(pause)
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(capacity, 1)
+        self.size = max(64, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+    
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'big')
+        second = int.from_bytes(digest[8:], 'big') | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+    
+    def add(self, item: str):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+    
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class DateUtils:
+    @staticmethod
+    def start_of_day(day: date) -> datetime:
+        return timezone.make_aware(datetime.combine(day, time.min))
+    
+    @staticmethod
+    def end_of_day(day: date) -> datetime:
+        return DateUtils.start_of_day(day + timedelta(days=1))
+
+
+class KeysetCursor:
+    @staticmethod
+    def encode(created_at: datetime, pk) -> str:
+        raw = f"{created_at.isoformat()}|{pk}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+    
+    @staticmethod
+    def decode(cursor: str) -> tuple:
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+            created_at, pk = raw.split('|', 1)
+            created_at = datetime.fromisoformat(created_at)
+            pk = str(uuid.UUID(pk))
+        except (ValueError, UnicodeError):
+            raise ValueError(f"Invalid cursor: {cursor}")
+        
+        # a naive timestamp would be compared in the server's timezone and silently skip or repeat rows
+        if timezone.is_naive(created_at):
+            raise ValueError(f"Invalid cursor: {cursor}")
+        return created_at, pk
+
+
 class MovementTypes:
     CREDIT = 'C'
     DEBIT = 'D'
@@ -107,3 +216,19 @@ class TransferStatus:
         (COMPLETED, 'Concluída'),
         (FAILED, 'Falhou'),
     ]
+
+
+class TransferDirection:
+    SENT = 'SENT'
+    RECEIVED = 'RECEIVED'
+    
+    CHOICES = [
+        (SENT, 'Enviada'),
+        (RECEIVED, 'Recebida'),
+    ]
+
+
+class BatchItemStatus:
+    APPLIED = 'APPLIED'
+    DUPLICATE = 'DUPLICATE'
+    REJECTED = 'REJECTED'
@@ -0,0 +1,236 @@
+import logging
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from typing import List, Optional, Tuple
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from .models import Transfer
+from shared.utils import TransferStatus
+from shared.exceptions import BankMoreException, ErrorTypes
+
+logger = logging.getLogger('bankmore')
+
+HOUR = 3600
+DAY = 86400
+
+LIMITS = [
+    ('HOURLY_AMOUNT', 'valor por hora'),
+    ('HOURLY_COUNT', 'quantidade por hora'),
+    ('DAILY_AMOUNT', 'valor diário'),
+    ('DAILY_COUNT', 'quantidade diária'),
+]
+
+
+def _cents(amount) -> int:
+    return int(Decimal(str(amount)) * 100)
+
+
+def _recent_transfers(account_id: str):
+    # pending transfers were accepted and still count; only failed ones give the limit back
+    return Transfer.objects.filter(
+        origin_account_id=account_id,
+        created_at__gte=timezone.now() - timedelta(seconds=DAY)
+    ).exclude(status=TransferStatus.FAILED)
+
+
+class DatabaseTransferLimitBackend:
+    # usage is read and compared without a lock, so concurrent transfers from one account that are all still
+    # uncommitted can together pass a limit; the redis backend checks and records atomically and should be
+    # used where the limits must hold strictly
+    def __init__(self, limits: dict):
+        self.limits = limits
+    
+    def reserve(self, account_id: str, entries: List[Tuple[str, Decimal]]) -> Optional[str]:
+        hour_start = timezone.now() - timedelta(seconds=HOUR)
+        usage = _recent_transfers(account_id).aggregate(
+            daily_amount=models.Sum('amount'),
+            daily_count=models.Count('id'),
+            hourly_amount=models.Sum('amount', filter=models.Q(created_at__gte=hour_start)),
+            hourly_count=models.Count('id', filter=models.Q(created_at__gte=hour_start))
+        )
+        
+        amount = sum((_cents(entry_amount) for _, entry_amount in entries), 0)
+        totals = {
+            'HOURLY_AMOUNT': _cents(usage['hourly_amount'] or 0) + amount,
+            'HOURLY_COUNT': usage['hourly_count'] + len(entries),
+            'DAILY_AMOUNT': _cents(usage['daily_amount'] or 0) + amount,
+            'DAILY_COUNT': usage['daily_count'] + len(entries),
+        }
+        
+        for name, _ in LIMITS:
+            if self.limits[name] and totals[name] > self.limits[name]:
+                return name
+        return None
+    
+    def release(self, account_id: str, entries: List[Tuple[str, Decimal]]):
+        # usage is read from the transfers themselves, so there is nothing to give back
+        pass
+
+
+class RedisTransferLimitBackend:
+    KEY_PREFIX = 'transfer_limits:'
+    
+    # one sorted set per account holds "<request_id>|<cents>" scored by time; a missing marker means
+    # the set cannot be trusted (never built, expired or flushed) and has to be seeded from the database
+    RESERVE_SCRIPT = """
+        if redis.call('EXISTS', KEYS[2]) == 0 then
+            return -1
+        end
+        
+        local now = tonumber(ARGV[1])
+        redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - tonumber(ARGV[3]))
+        
+        local hour_start = now - tonumber(ARGV[2])
+        local hourly_amount, hourly_count, daily_amount, daily_count = 0, 0, 0, 0
+        local entries = redis.call('ZRANGE', KEYS[1], 0, -1, 'WITHSCORES')
+        for i = 1, #entries, 2 do
+            local cents = tonumber(string.match(entries[i], '|(%d+)$'))
+            daily_amount = daily_amount + cents
+            daily_count = daily_count + 1
+            if tonumber(entries[i + 1]) > hour_start then
+                hourly_amount = hourly_amount + cents
+                hourly_count = hourly_count + 1
+            end
+        end
+        
+        for i = 8, #ARGV, 2 do
+            local cents = tonumber(ARGV[i + 1])
+            hourly_amount = hourly_amount + cents
+            hourly_count = hourly_count + 1
+            daily_amount = daily_amount + cents
+            daily_count = daily_count + 1
+        end
+        
+        local totals = {hourly_amount, hourly_count, daily_amount, daily_count}
+        for i = 1, 4 do
+            local limit = tonumber(ARGV[3 + i])
+            if limit > 0 and totals[i] > limit then
+                return i
+            end
+        end
+        
+        for i = 8, #ARGV, 2 do
+            redis.call('ZADD', KEYS[1], now, ARGV[i] .. '|' .. ARGV[i + 1])
+        end
+        redis.call('EXPIRE', KEYS[1], ARGV[3])
+        redis.call('EXPIRE', KEYS[2], ARGV[3])
+        return 0
+    """
+    
+    SEED_SCRIPT = """
+        if redis.call('EXISTS', KEYS[2]) == 1 then
+            return 0
+        end
+        
+        redis.call('DEL', KEYS[1])
+        for i = 2, #ARGV, 2 do
+            redis.call('ZADD', KEYS[1], ARGV[i + 1], ARGV[i])
+        end
+        redis.call('EXPIRE', KEYS[1], ARGV[1])
+        redis.call('SET', KEYS[2], 1, 'EX', ARGV[1])
+        return 1
+    """
+    
+    def __init__(self, limits: dict):
+        self.limits = limits
+    
+    @property
+    def redis(self):
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+    
+    def reserve(self, account_id: str, entries: List[Tuple[str, Decimal]]) -> Optional[str]:
+        result = self._reserve(account_id, entries)
+        if result == -1:
+            self.rebuild(account_id)
+            result = self._reserve(account_id, entries)
+        
+        return LIMITS[result - 1][0] if result > 0 else None
+    
+    def release(self, account_id: str, entries: List[Tuple[str, Decimal]]):
+        self.redis.zrem(self._key(account_id), *[f"{ref}|{_cents(amount)}" for ref, amount in entries])
+    
+    def rebuild(self, account_id: str):
+        args = [DAY]
+        for pk, ref, amount, created_at in _recent_transfers(account_id).values_list('pk', 'idempotency_key', 'amount', 'created_at'):
+            args.extend([f"{ref or pk}|{_cents(amount)}", created_at.timestamp()])
+        
+        seed = self.redis.register_script(self.SEED_SCRIPT)
+        if seed(keys=[self._key(account_id), self._marker(account_id)], args=args):
+            logger.info(f"Transfer limit window rebuilt for account {account_id}: {len(args) // 2} transfers")
+    
+    def _reserve(self, account_id: str, entries: List[Tuple[str, Decimal]]) -> int:
+        args = [time.time(), HOUR, DAY] + [self.limits[name] for name, _ in LIMITS]
+        for ref, amount in entries:
+            args.extend([ref, _cents(amount)])
+        
+        reserve = self.redis.register_script(self.RESERVE_SCRIPT)
+        return reserve(keys=[self._key(account_id), self._marker(account_id)], args=args)
+    
+    def _key(self, account_id: str) -> str:
+        return f"{self.KEY_PREFIX}{account_id}"
+    
+    def _marker(self, account_id: str) -> str:
+        return f"{self.KEY_PREFIX}{account_id}:ready"
+
+
+class TransferLimitService:
+    _backend = None
+    
+    @staticmethod
+    def backend():
+        if TransferLimitService._backend is None:
+            limit_settings = settings.TRANSFER_LIMIT_SETTINGS
+            limits = {
+                'HOURLY_AMOUNT': _cents(limit_settings['HOURLY_AMOUNT']),
+                'HOURLY_COUNT': limit_settings['HOURLY_COUNT'],
+                'DAILY_AMOUNT': _cents(limit_settings['DAILY_AMOUNT']),
+                'DAILY_COUNT': limit_settings['DAILY_COUNT'],
+            }
+            if limit_settings['BACKEND'] == 'redis':
+                TransferLimitService._backend = RedisTransferLimitBackend(limits)
+            else:
+                TransferLimitService._backend = DatabaseTransferLimitBackend(limits)
+        return TransferLimitService._backend
+    
+    @staticmethod
+    def reserve(account_id: str, entries: List[Tuple[str, Decimal]]):
+        if not settings.TRANSFER_LIMIT_SETTINGS['ENABLED'] or not entries:
+            return
+        
+        exceeded = TransferLimitService.backend().reserve(str(account_id), entries)
+        if exceeded:
+            logger.warning(f"Transfer limit {exceeded} exceeded for account {account_id}")
+            raise BankMoreException(
+                f"Limite de transferências excedido ({dict(LIMITS)[exceeded]})",
+                ErrorTypes.TRANSFER_LIMIT_EXCEEDED
+            )
+    
+    @staticmethod
+    def release(account_id: str, entries: List[Tuple[str, Decimal]]):
+        if not settings.TRANSFER_LIMIT_SETTINGS['ENABLED'] or not entries:
+            return
+        
+        try:
+            TransferLimitService.backend().release(str(account_id), entries)
+        except Exception as e:
+            logger.error(f"Failed to release transfer limit reservation for account {account_id}: {e}")
+    
+    @staticmethod
+    @contextmanager
+    def release_on_error(account_id: str, entries: List[Tuple[str, Decimal]]):
+        try:
+            yield
+        except Exception:
+            TransferLimitService.release(account_id, entries)
+            raise
+    
+    @staticmethod
+    @contextmanager
+    def hold(account_id: str, entries: List[Tuple[str, Decimal]]):
+        TransferLimitService.reserve(account_id, entries)
+        with TransferLimitService.release_on_error(account_id, entries):
+            yield
@@ -0,0 +1,55 @@
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from transfer_api.services import TransferStatsService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-account daily transfer and fee totals from history (defaults to every day up to yesterday)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--start',
+            help='First day to rebuild in YYYY-MM-DD format (defaults to the first recorded activity)'
+        )
+        parser.add_argument(
+            '--end',
+            help='Last day to rebuild in YYYY-MM-DD format'
+        )
+        parser.add_argument(
+            '--chunk-days',
+            type=int,
+            default=7,
+            help='Number of days aggregated and rewritten per transaction'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rows written per insert'
+        )
+    
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options['start']) if options['start'] else TransferStatsService.first_activity_date()
+            end = date.fromisoformat(options['end']) if options['end'] else timezone.localdate() - timedelta(days=1)
+        except ValueError as e:
+            raise CommandError(f'Invalid date: {e}')
+        
+        if options['chunk_days'] < 1 or options['batch_size'] < 1:
+            raise CommandError('Chunk days and batch size must be positive')
+        
+        if start is None or start > end:
+            self.stdout.write('Nothing to rebuild')
+            return
+        
+        written = TransferStatsService.backfill(
+            start,
+            end,
+            chunk_days=options['chunk_days'],
+            batch_size=options['batch_size']
+        )
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt {written} daily stats rows from {start} to {end}')
+        )
@@ -20,6 +20,7 @@ class Transfer(BaseModel):
     description = models.CharField(max_length=255, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     idempotency_key = models.CharField(max_length=255, null=True, blank=True, db_index=True)
+    batch_id = models.UUIDField(null=True, blank=True, db_index=True)
     
     class Meta:
         db_table = 'transferencia'
@@ -49,3 +50,25 @@ class Transfer(BaseModel):
     def mark_failed(self):
         self.status = TransferStatus.FAILED
         self.save()
+
+
+class DailyTransferStats(BaseModel):
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='daily_transfer_stats')
+    date = models.DateField()
+    sent_amount = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    sent_count = models.IntegerField(default=0)
+    received_amount = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    received_count = models.IntegerField(default=0)
+    fee_amount = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    fee_count = models.IntegerField(default=0)
+    
+    class Meta:
+        db_table = 'resumo_diario'
+        verbose_name = 'Resumo Diário'
+        verbose_name_plural = 'Resumos Diários'
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'date'], name='uniq_resumo_diario_conta_data'),
+        ]
+    
+    def __str__(self):
+        return f"Daily stats {self.date} - Account {self.account.number}"
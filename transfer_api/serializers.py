@@ -1,14 +1,18 @@
 from rest_framework import serializers
 from decimal import Decimal
+from django.conf import settings
 from .models import Transfer
 from account_api.models import Account
-from shared.utils import MoneyUtils
+from account_api.services import account_number_filter
+from shared.identity_map import IdentityMap
+from shared.utils import MoneyUtils, TransferStatus, TransferDirection
+from shared.serializers import KeysetCursorField, AccountNumberField, ItemErrorSerializer, validate_batch_items
 from shared.exceptions import BankMoreException, ErrorTypes
 
 
-class CreateTransferSerializer(serializers.Serializer):
+class TransferItemSerializer(serializers.Serializer):
     request_id = serializers.CharField(max_length=255)
-    destination_account_number = serializers.CharField(max_length=10)
+    destination_account_number = AccountNumberField()
     amount = serializers.DecimalField(max_digits=15, decimal_places=2)
     
     def validate_amount(self, value):
@@ -18,9 +22,18 @@ class CreateTransferSerializer(serializers.Serializer):
                 ErrorTypes.INVALID_VALUE
             )
         return value
-    
+
+
+class CreateTransferSerializer(TransferItemSerializer):
     def validate_destination_account_number(self, value):
-        if not Account.objects.filter(number=value, active=True).exists():
+        account = None
+        if account_number_filter.might_exist(value):
+            try:
+                account = IdentityMap.get(Account, 'number', value)
+            except Account.DoesNotExist:
+                pass
+        
+        if account is None or not account.active:
             raise BankMoreException(
                 "Conta de destino não encontrada ou inativa",
                 ErrorTypes.ACCOUNT_NOT_FOUND
@@ -28,6 +41,33 @@ class CreateTransferSerializer(serializers.Serializer):
         return value
 
 
+class CreateTransferBatchSerializer(serializers.Serializer):
+    MAX_TRANSFERS = 5000
+    
+    transfers = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=MAX_TRANSFERS
+    )
+    
+    def validate_transfers(self, value):
+        # destinations are resolved by the service in a single query, not per item here
+        return validate_batch_items(value, TransferItemSerializer)
+
+
+class TransferBatchItemResultSerializer(serializers.Serializer):
+    request_id = serializers.CharField(allow_null=True)
+    transfer_id = serializers.UUIDField(allow_null=True)
+    status = serializers.CharField()
+    error = ItemErrorSerializer(allow_null=True)
+
+
+class TransferBatchResultSerializer(serializers.Serializer):
+    batch_id = serializers.UUIDField()
+    total_amount = serializers.DecimalField(max_digits=15, decimal_places=2)
+    results = TransferBatchItemResultSerializer(many=True)
+
+
 class TransferSerializer(serializers.ModelSerializer):
     origin_account_number = serializers.CharField(source='origin_account.number', read_only=True)
     destination_account_number = serializers.CharField(source='destination_account.number', read_only=True)
@@ -52,3 +92,78 @@ class TransferResponseSerializer(serializers.Serializer):
     origin_account_number = serializers.CharField()
     destination_account_number = serializers.CharField()
     amount = serializers.DecimalField(max_digits=15, decimal_places=2)
+
+
+class TransferAcceptedSerializer(serializers.Serializer):
+    transfer_id = serializers.UUIDField()
+    message = serializers.CharField()
+    status = serializers.ChoiceField(choices=TransferStatus.CHOICES)
+
+
+class TransferExportQuerySerializer(serializers.Serializer):
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    
+    def validate(self, attrs):
+        start_date = attrs.get('start_date')
+        end_date = attrs.get('end_date')
+        if start_date and end_date and end_date < start_date:
+            raise BankMoreException(
+                "Data final deve ser maior ou igual à data inicial",
+                ErrorTypes.INVALID_ARGUMENT
+            )
+        return attrs
+
+
+class TransferHistoryQuerySerializer(TransferExportQuerySerializer):
+    MAX_PAGE_SIZE = 100
+    
+    cursor = KeysetCursorField(required=False)
+    page_size = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        max_value=MAX_PAGE_SIZE,
+        default=settings.REST_FRAMEWORK['PAGE_SIZE']
+    )
+    direction = serializers.ChoiceField(choices=TransferDirection.CHOICES, required=False)
+    status = serializers.ChoiceField(choices=TransferStatus.CHOICES, required=False)
+
+
+class TransferHistorySerializer(serializers.Serializer):
+    account_number = serializers.CharField()
+    results = TransferSerializer(many=True)
+    next_cursor = serializers.CharField(allow_null=True)
+
+
+class TransferStatsQuerySerializer(TransferExportQuerySerializer):
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        start_date = attrs.get('start_date')
+        end_date = attrs.get('end_date')
+        if start_date and end_date and (end_date - start_date).days >= settings.TRANSFER_SETTINGS['STATS_MAX_DAYS']:
+            raise BankMoreException(
+                f"Período máximo de {settings.TRANSFER_SETTINGS['STATS_MAX_DAYS']} dias",
+                ErrorTypes.INVALID_ARGUMENT
+            )
+        return attrs
+
+
+class TransferStatsTotalsSerializer(serializers.Serializer):
+    sent_amount = serializers.DecimalField(max_digits=15, decimal_places=2)
+    sent_count = serializers.IntegerField()
+    received_amount = serializers.DecimalField(max_digits=15, decimal_places=2)
+    received_count = serializers.IntegerField()
+    fee_amount = serializers.DecimalField(max_digits=15, decimal_places=2)
+    fee_count = serializers.IntegerField()
+
+
+class TransferStatsDaySerializer(TransferStatsTotalsSerializer):
+    date = serializers.DateField()
+
+
+class TransferStatsSerializer(serializers.Serializer):
+    account_number = serializers.CharField()
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    totals = TransferStatsTotalsSerializer()
+    days = TransferStatsDaySerializer(many=True)
@@ -1,13 +1,28 @@
+import heapq
 import logging
+import uuid
+from contextlib import nullcontext
+from datetime import date, timedelta
+from itertools import islice
 import requests
 from decimal import Decimal
-from django.db import transaction
+from django.db import models, transaction
 from django.db.models import Q
+from django.db.models.functions import TruncDate
 from django.conf import settings
-from .models import Transfer
-from account_api.models import Account
-from shared.utils import MovementTypes, TransferStatus
-from shared.services import IdempotencyService, CacheService, kafka_service
+from django.utils import timezone
+from .models import Transfer, DailyTransferStats
+from .serializers import TransferSerializer
+from .limits import TransferLimitService
+from account_api.models import Account, Movement
+from account_api.services import AccountService
+from fee_api.models import Fee
+from shared.identity_map import IdentityMap
+from shared.ledger import LedgerService
+from shared.locks import AccountLocks
+from shared.http_client import account_api_client
+from shared.utils import MovementTypes, TransferStatus, TransferDirection, DateUtils, BatchUtils, BatchItemStatus, KeysetCursor
+from shared.services import IdempotencyService, OutboxService, CacheService
 from shared.exceptions import BankMoreException, ErrorTypes
 
 logger = logging.getLogger('bankmore')
@@ -17,17 +32,14 @@ class AccountApiService:
     @staticmethod
     def create_movement(account_number: str, amount: Decimal, movement_type: str, request_id: str):
         try:
-            account_api_url = getattr(settings, 'ACCOUNT_API_BASE_URL', 'http://localhost:8001')
-            
-            response = requests.post(
-                f"{account_api_url}/api/account/movement/",
+            response = account_api_client.post(
+                "/api/account/movement/",
                 json={
                     'request_id': request_id,
                     'account_number': account_number,
                     'amount': str(amount),
                     'type': movement_type
-                },
-                timeout=30
+                }
             )
             
             if response.status_code not in [200, 204]:
@@ -50,48 +62,16 @@ class AccountApiService:
 class TransferService:
     @staticmethod
     def create_transfer(request_id: str, origin_account_id: str, destination_account_number: str, amount: Decimal) -> dict:
-        cached_response = IdempotencyService.check_idempotency(
-            request_id,
-            {
-                'origin_account_id': origin_account_id,
-                'destination_account_number': destination_account_number,
-                'amount': str(amount)
-            }
-        )
+        cached_response = TransferService._check_idempotency(request_id, origin_account_id, destination_account_number, amount)
         
         if cached_response:
             return cached_response
         
-        try:
-            origin_account = Account.objects.get(id=origin_account_id)
-            destination_account = Account.objects.get(number=destination_account_number)
-            
-            if not origin_account.active:
-                raise BankMoreException(
-                    "Conta de origem inativa",
-                    ErrorTypes.INACTIVE_ACCOUNT
-                )
-            
-            if not destination_account.active:
-                raise BankMoreException(
-                    "Conta de destino inativa",
-                    ErrorTypes.INACTIVE_ACCOUNT
-                )
-            
-            if origin_account.number == destination_account.number:
-                raise BankMoreException(
-                    "Não é possível transferir para a mesma conta",
-                    ErrorTypes.INVALID_TRANSFER
-                )
-            
-            current_balance = origin_account.get_balance()
-            if current_balance < amount:
-                raise BankMoreException(
-                    "Saldo insuficiente",
-                    ErrorTypes.INSUFFICIENT_BALANCE
-                )
+        # limits are checked and reserved before any database work; a failure below gives them back
+        with IdempotencyService.release_on_error(request_id), TransferLimitService.hold(origin_account_id, [(request_id, amount)]):
+            origin_account, destination_account = TransferService._validate_transfer(origin_account_id, destination_account_number, amount)
             
-            with transaction.atomic():
+            with TransferService._origin_lock(origin_account), transaction.atomic():
                 transfer = Transfer.objects.create(
                     origin_account=origin_account,
                     destination_account=destination_account,
@@ -101,40 +81,11 @@ class TransferService:
                 )
                 
                 try:
-                    debit_request_id = f"{request_id}-debit"
-                    AccountApiService.create_movement(
-                        origin_account.number,
-                        amount,
-                        MovementTypes.DEBIT,
-                        debit_request_id
-                    )
-                    
-                    credit_request_id = f"{request_id}-credit"
-                    AccountApiService.create_movement(
-                        destination_account.number,
-                        amount,
-                        MovementTypes.CREDIT,
-                        credit_request_id
-                    )
+                    TransferService._post_legs(origin_account, destination_account, amount, request_id)
                     
                     transfer.mark_completed()
                     
-                    cache_key_origin = CacheService.get_account_balance_key(origin_account.number)
-                    cache_key_dest = CacheService.get_account_balance_key(destination_account.number)
-                    CacheService.delete(cache_key_origin)
-                    CacheService.delete(cache_key_dest)
-                    
-                    transfer_data = {
-                        'id': str(transfer.id),
-                        'origin_account_number': origin_account.number,
-                        'destination_account_number': destination_account.number,
-                        'amount': str(amount),
-                        'request_id': request_id
-                    }
-                    
-                    kafka_service.send_transfer_completed(transfer_data)
-                    
-                    logger.info(f"Transfer completed: {transfer.id} from {origin_account.number} to {destination_account.number}")
+                    TransferService._notify_completed(transfer)
                     
                     response = {
                         'transfer_id': str(transfer.id),
@@ -151,23 +102,461 @@ class TransferService:
                     transfer.mark_failed()
                     logger.error(f"Transfer failed: {e}")
                     raise
+    
+    @staticmethod
+    def accept_transfer(request_id: str, origin_account_id: str, destination_account_number: str, amount: Decimal) -> dict:
+        cached_response = TransferService._check_idempotency(request_id, origin_account_id, destination_account_number, amount)
+        
+        if cached_response:
+            return cached_response
+        
+        with IdempotencyService.release_on_error(request_id), TransferLimitService.hold(origin_account_id, [(request_id, amount)]):
+            origin_account, destination_account = TransferService._validate_transfer(origin_account_id, destination_account_number, amount)
+            
+            with transaction.atomic():
+                transfer = Transfer.objects.create(
+                    origin_account=origin_account,
+                    destination_account=destination_account,
+                    amount=amount,
+                    description=f"Transferência para conta {destination_account.number}",
+                    idempotency_key=request_id
+                )
+                
+                response = {
+                    'transfer_id': str(transfer.id),
+                    'message': 'Transferência aceita para processamento',
+                    'status': TransferStatus.PENDING
+                }
+                
+                IdempotencyService.save_response(request_id, response)
+                transaction.on_commit(lambda: TransferService._enqueue_execution(str(transfer.id)))
+                
+                logger.info(f"Transfer accepted: {transfer.id} from {origin_account.number} to {destination_account.number}")
+                return response
+    
+    @staticmethod
+    def create_transfers_batch(entries: list, origin_account_id: str, chunk_size: int = 500) -> dict:
+        batch_id = uuid.uuid4()
+        results = [None] * len(entries)
+        pending = {}
+        
+        for index, entry in enumerate(entries):
+            if entry['error']:
+                results[index] = TransferService._batch_result(entry['request_id'], BatchItemStatus.REJECTED, error=entry['error'])
+            elif entry['data']['request_id'] in pending:
+                results[index] = TransferService._batch_result(entry['request_id'], BatchItemStatus.DUPLICATE)
+            else:
+                pending[entry['data']['request_id']] = index
+        
+        try:
+            origin_account = IdentityMap.get(Account, 'id', origin_account_id)
+        except Account.DoesNotExist:
+            raise BankMoreException(
+                "Conta não encontrada",
+                ErrorTypes.ACCOUNT_NOT_FOUND
+            )
+        
+        if not origin_account.active:
+            raise BankMoreException(
+                "Conta de origem inativa",
+                ErrorTypes.INACTIVE_ACCOUNT
+            )
+        
+        if pending:
+            cached_responses = IdempotencyService.check_idempotency_many({
+                request_id: {
+                    'origin_account_id': origin_account_id,
+                    'destination_account_number': entries[index]['data']['destination_account_number'],
+                    'amount': str(entries[index]['data']['amount'])
+                }
+                for request_id, index in pending.items()
+            })
+            
+            for request_id, response in cached_responses.items():
+                results[pending.pop(request_id)] = TransferService._batch_result(
+                    request_id,
+                    BatchItemStatus.DUPLICATE,
+                    transfer_id=(response or {}).get('transfer_id')
+                )
+        
+        transfers = []
+        reserved = []
+        # the limit reservation is made inside the transaction, so it is given back on any failure up to the commit
+        with TransferLimitService.release_on_error(origin_account_id, reserved), IdempotencyService.release_on_error(*pending), \
+                TransferService._origin_lock(origin_account), transaction.atomic():
+            # the instance came from the identity map before the lock, so its balance may already be stale
+            origin_account.refresh_from_db(fields=['balance'])
+            
+            destinations = Account.objects.in_bulk(
+                {entries[index]['data']['destination_account_number'] for index in pending.values()},
+                field_name='number'
+            )
+            now = timezone.now()
+            
+            for request_id, index in pending.items():
+                data = entries[index]['data']
+                destination_account = destinations.get(data['destination_account_number'])
+                
+                if destination_account is None or not destination_account.active:
+                    error = {'message': "Conta de destino não encontrada ou inativa", 'type': ErrorTypes.ACCOUNT_NOT_FOUND}
+                elif destination_account.pk == origin_account.pk:
+                    error = {'message': "Não é possível transferir para a mesma conta", 'type': ErrorTypes.INVALID_TRANSFER}
+                else:
+                    error = None
+                
+                if error:
+                    results[index] = TransferService._batch_result(request_id, BatchItemStatus.REJECTED, error=error)
+                    continue
+                
+                transfers.append(Transfer(
+                    origin_account=origin_account,
+                    destination_account=destination_account,
+                    amount=data['amount'],
+                    status=TransferStatus.COMPLETED,
+                    description=f"Transferência para conta {destination_account.number}",
+                    completed_at=now,
+                    idempotency_key=request_id,
+                    batch_id=batch_id
+                ))
+            
+            total_amount = sum((transfer.amount for transfer in transfers), Decimal('0'))
+            
+            # the whole payroll is checked against the balance once, and goes through all or nothing
+            if transfers and origin_account.get_balance() < total_amount:
+                TransferService._reject_batch(transfers, pending, results, "Saldo insuficiente", ErrorTypes.INSUFFICIENT_BALANCE)
+                transfers = []
+                total_amount = Decimal('0')
+            
+            limit_entries = [(transfer.idempotency_key, transfer.amount) for transfer in transfers]
+            try:
+                TransferLimitService.reserve(origin_account_id, limit_entries)
+                reserved.extend(limit_entries)
+            except BankMoreException as e:
+                if e.error_type != ErrorTypes.TRANSFER_LIMIT_EXCEEDED:
+                    raise
+                TransferService._reject_batch(transfers, pending, results, e.message, e.error_type)
+                transfers = []
+                total_amount = Decimal('0')
+            
+            if transfers:
+                try:
+                    with transaction.atomic():
+                        Transfer.objects.bulk_create(transfers, batch_size=chunk_size)
+                        TransferService._post_batch_legs(transfers, chunk_size)
+                except BankMoreException as e:
+                    if e.error_type != ErrorTypes.INSUFFICIENT_BALANCE:
+                        raise
                     
+                    # the debit guard caught a balance spent in the meantime and the savepoint undid the rows,
+                    # so the items are reported as rejected and the limit reservation is given back
+                    TransferService._reject_batch(transfers, pending, results, e.message, e.error_type)
+                    TransferLimitService.release(origin_account_id, reserved)
+                    reserved.clear()
+                    transfers = []
+                    total_amount = Decimal('0')
+            
+            if transfers:
+                for transfer in transfers:
+                    results[pending[transfer.idempotency_key]] = TransferService._batch_result(
+                        transfer.idempotency_key,
+                        BatchItemStatus.APPLIED,
+                        transfer_id=str(transfer.id)
+                    )
+                
+                IdempotencyService.save_responses({
+                    transfer.idempotency_key: {
+                        'transfer_id': str(transfer.id),
+                        'message': 'Transferência realizada com sucesso',
+                        'origin_account_number': origin_account.number,
+                        'destination_account_number': transfer.destination_account.number,
+                        'amount': transfer.amount
+                    }
+                    for transfer in transfers
+                })
+                
+                AccountService.refresh_cached_balances(
+                    [origin_account.number] + list({transfer.destination_account.number for transfer in transfers})
+                )
+                
+                events = [
+                    {
+                        'id': str(transfer.id),
+                        'origin_account_number': origin_account.number,
+                        'destination_account_number': transfer.destination_account.number,
+                        'amount': str(transfer.amount),
+                        'request_id': transfer.idempotency_key
+                    }
+                    for transfer in transfers
+                ]
+                OutboxService.enqueue_transfers_completed(events)
+                TransferStatsService.record_transfers(transfers, batch_size=chunk_size)
+        
+        IdempotencyService.release_many([
+            request_id for request_id, index in pending.items()
+            if results[index]['status'] == BatchItemStatus.REJECTED
+        ])
+        
+        logger.info(f"Transfer batch {batch_id} processed: {len(transfers)} applied out of {len(entries)} items, total {total_amount}")
+        return {
+            'batch_id': batch_id,
+            'total_amount': total_amount,
+            'results': results
+        }
+    
+    @staticmethod
+    def _post_batch_legs(transfers: list, chunk_size: int):
+        if settings.LEDGER_SETTINGS['MODE'] == 'local':
+            movements = []
+            for transfer in transfers:
+                movements.append(Movement(
+                    account=transfer.origin_account,
+                    amount=transfer.amount,
+                    type=MovementTypes.DEBIT,
+                    description=transfer.description,
+                    idempotency_key=f"{transfer.idempotency_key}-debit"
+                ))
+                movements.append(Movement(
+                    account=transfer.destination_account,
+                    amount=transfer.amount,
+                    type=MovementTypes.CREDIT,
+                    description=f"Transferência da conta {transfer.origin_account.number}",
+                    idempotency_key=f"{transfer.idempotency_key}-credit"
+                ))
+            LedgerService.post(movements, batch_size=chunk_size)
+            return
+        
+        for transfer in transfers:
+            TransferService._post_legs(transfer.origin_account, transfer.destination_account, transfer.amount, transfer.idempotency_key)
+    
+    @staticmethod
+    def _reject_batch(transfers: list, pending: dict, results: list, message: str, error_type: str):
+        for transfer in transfers:
+            results[pending[transfer.idempotency_key]] = TransferService._batch_result(
+                transfer.idempotency_key,
+                BatchItemStatus.REJECTED,
+                error={'message': message, 'type': error_type}
+            )
+    
+    @staticmethod
+    def _batch_result(request_id: str, status: str, transfer_id: str = None, error: dict = None) -> dict:
+        return {'request_id': request_id, 'transfer_id': transfer_id, 'status': status, 'error': error}
+    
+    @staticmethod
+    def execute_transfer(transfer_id: str):
+        try:
+            transfer = Transfer.objects.select_related('origin_account', 'destination_account').get(id=transfer_id)
+        except Transfer.DoesNotExist:
+            logger.error(f"Transfer not found for execution: {transfer_id}")
+            return
+        
+        try:
+            with TransferService._origin_lock(transfer.origin_account), transaction.atomic():
+                now = timezone.now()
+                # claiming the row first makes a redelivered task a no-op instead of a second posting
+                claimed = Transfer.objects.filter(pk=transfer.pk, status=TransferStatus.PENDING).update(
+                    status=TransferStatus.COMPLETED,
+                    completed_at=now,
+                    updated_at=now
+                )
+                if not claimed:
+                    logger.info(f"Transfer already processed: {transfer.id}")
+                    return
+                
+                transfer.status = TransferStatus.COMPLETED
+                transfer.completed_at = now
+                
+                TransferService._post_legs(transfer.origin_account, transfer.destination_account, transfer.amount, transfer.idempotency_key)
+                
+                TransferService._notify_completed(transfer)
+                
+        except BankMoreException as e:
+            if e.error_type == ErrorTypes.INTERNAL_ERROR:
+                raise
+            
+            TransferService.fail_transfer(transfer_id, e.message)
+    
+    @staticmethod
+    def sweep_pending(retry_after: int, fail_after: int, batch_size: int = 500) -> dict:
+        now = timezone.now()
+        stale = Transfer.objects.filter(
+            status=TransferStatus.PENDING,
+            created_at__lt=now - timedelta(seconds=retry_after)
+        ).order_by('created_at')
+        
+        expired = list(stale.filter(created_at__lt=now - timedelta(seconds=fail_after)).values_list('pk', flat=True)[:batch_size])
+        for transfer_id in expired:
+            TransferService.fail_transfer(str(transfer_id), "Transferência não processada dentro do prazo")
+        
+        # execution claims the row before posting, so enqueueing a transfer whose task is still queued is harmless
+        requeued = 0
+        for transfer_id in stale.filter(created_at__gte=now - timedelta(seconds=fail_after)).values_list('pk', flat=True)[:batch_size]:
+            requeued += TransferService._enqueue_execution(str(transfer_id))
+        
+        if expired or requeued:
+            logger.info(f"Pending transfer sweep: {requeued} requeued, {len(expired)} failed")
+        
+        return {'requeued': requeued, 'failed': len(expired)}
+    
+    @staticmethod
+    def _enqueue_execution(transfer_id: str) -> bool:
+        from .tasks import execute_transfer
+        
+        try:
+            execute_transfer.delay(transfer_id)
+            return True
+        except Exception as e:
+            # the transfer is already committed as pending; the sweeper enqueues it again later
+            logger.error(f"Failed to enqueue transfer {transfer_id}, leaving it for the sweeper: {e}")
+            return False
+    
+    @staticmethod
+    def fail_transfer(transfer_id: str, reason: str):
+        failed = Transfer.objects.filter(pk=transfer_id, status=TransferStatus.PENDING).update(
+            status=TransferStatus.FAILED,
+            updated_at=timezone.now()
+        )
+        logger.warning(f"Transfer failed: {transfer_id} - {reason}")
+        
+        if failed:
+            transfer = Transfer.objects.only('origin_account_id', 'idempotency_key', 'amount').get(pk=transfer_id)
+            TransferLimitService.release(transfer.origin_account_id, [(transfer.idempotency_key, transfer.amount)])
+    
+    @staticmethod
+    def _check_idempotency(request_id: str, origin_account_id: str, destination_account_number: str, amount: Decimal):
+        return IdempotencyService.check_idempotency(
+            request_id,
+            {
+                'origin_account_id': origin_account_id,
+                'destination_account_number': destination_account_number,
+                'amount': str(amount)
+            }
+        )
+    
+    @staticmethod
+    def _validate_transfer(origin_account_id: str, destination_account_number: str, amount: Decimal) -> tuple:
+        try:
+            origin_account = IdentityMap.get(Account, 'id', origin_account_id)
+            destination_account = IdentityMap.get(Account, 'number', destination_account_number)
         except Account.DoesNotExist:
             raise BankMoreException(
                 "Conta não encontrada",
                 ErrorTypes.ACCOUNT_NOT_FOUND
             )
+        
+        if not origin_account.active:
+            raise BankMoreException(
+                "Conta de origem inativa",
+                ErrorTypes.INACTIVE_ACCOUNT
+            )
+        
+        if not destination_account.active:
+            raise BankMoreException(
+                "Conta de destino inativa",
+                ErrorTypes.INACTIVE_ACCOUNT
+            )
+        
+        if origin_account.number == destination_account.number:
+            raise BankMoreException(
+                "Não é possível transferir para a mesma conta",
+                ErrorTypes.INVALID_TRANSFER
+            )
+        
+        current_balance = origin_account.get_balance()
+        if current_balance < amount:
+            raise BankMoreException(
+                "Saldo insuficiente",
+                ErrorTypes.INSUFFICIENT_BALANCE
+            )
+        
+        return origin_account, destination_account
+    
+    @staticmethod
+    def _notify_completed(transfer: Transfer):
+        origin_account = transfer.origin_account
+        destination_account = transfer.destination_account
+        
+        AccountService.refresh_cached_balance(origin_account.number)
+        AccountService.refresh_cached_balance(destination_account.number)
+        
+        transfer_data = {
+            'id': str(transfer.id),
+            'origin_account_number': origin_account.number,
+            'destination_account_number': destination_account.number,
+            'amount': str(transfer.amount),
+            'request_id': transfer.idempotency_key
+        }
+        
+        OutboxService.enqueue_transfers_completed([transfer_data])
+        TransferStatsService.record_transfers([transfer])
+        
+        logger.info(f"Transfer completed: {transfer.id} from {origin_account.number} to {destination_account.number}")
+    
+    @staticmethod
+    def _origin_lock(origin_account: Account):
+        # taken before the transfer's own transaction, so the stripe is held until it commits and always
+        # before any database write lock; the ledger reuses it when it posts the debit
+        if settings.LEDGER_SETTINGS['MODE'] == 'local':
+            return AccountLocks.hold(origin_account.pk)
+        return nullcontext()
+    
+    @staticmethod
+    def _post_legs(origin_account: Account, destination_account: Account, amount: Decimal, request_id: str):
+        if settings.LEDGER_SETTINGS['MODE'] == 'local':
+            LedgerService.post_transfer(origin_account, destination_account, amount, request_id)
+            return
+        
+        AccountApiService.create_movement(
+            origin_account.number,
+            amount,
+            MovementTypes.DEBIT,
+            f"{request_id}-debit"
+        )
+        
+        AccountApiService.create_movement(
+            destination_account.number,
+            amount,
+            MovementTypes.CREDIT,
+            f"{request_id}-credit"
+        )
     
     @staticmethod
-    def get_transfers_by_account(account_id: str) -> list:
+    def get_transfer_history(account_id: str, page_size: int, cursor: str = None, direction: str = None, transfer_status: int = None, start_date=None, end_date=None) -> dict:
         try:
             account = Account.objects.get(id=account_id)
             
-            transfers = Transfer.objects.filter(
-                Q(origin_account=account) | Q(destination_account=account)
-            ).select_related('origin_account', 'destination_account').order_by('-created_at')
+            # one query per side keeps each on its (account, created_at) index; an OR would scan both
+            sides = []
+            if direction != TransferDirection.RECEIVED:
+                sides.append(Transfer.objects.filter(origin_account=account))
+            if direction != TransferDirection.SENT:
+                sides.append(Transfer.objects.filter(destination_account=account))
+            
+            pages = []
+            for transfers in sides:
+                transfers = TransferService._filter_transfers(transfers, transfer_status, start_date, end_date)
+                
+                if cursor:
+                    created_at, pk = KeysetCursor.decode(cursor)
+                    transfers = transfers.filter(
+                        Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+                    )
+                
+                pages.append(list(
+                    transfers.select_related('origin_account', 'destination_account').order_by('-created_at', '-id')[:page_size + 1]
+                ))
+            
+            page = list(islice(heapq.merge(*pages, key=lambda transfer: (transfer.created_at, transfer.id), reverse=True), page_size + 1))
             
-            return list(transfers)
+            next_cursor = None
+            if len(page) > page_size:
+                page = page[:page_size]
+                next_cursor = KeysetCursor.encode(page[-1].created_at, page[-1].id)
+            
+            return {
+                'account_number': account.number,
+                'results': page,
+                'next_cursor': next_cursor
+            }
             
         except Account.DoesNotExist:
             raise BankMoreException(
@@ -175,6 +564,82 @@ class TransferService:
                 ErrorTypes.ACCOUNT_NOT_FOUND
             )
     
+    @staticmethod
+    def _filter_transfers(transfers, transfer_status: int = None, start_date=None, end_date=None):
+        if transfer_status is not None:
+            transfers = transfers.filter(status=transfer_status)
+        if start_date:
+            transfers = transfers.filter(created_at__gte=DateUtils.start_of_day(start_date))
+        if end_date:
+            transfers = transfers.filter(created_at__lt=DateUtils.end_of_day(end_date))
+        
+        return transfers
+    
+    @staticmethod
+    def export_transfers(account_id: str, start_date=None, end_date=None, chunk_size: int = 2000):
+        try:
+            account = Account.objects.get(id=account_id)
+            
+            transfers = TransferService._filter_transfers(
+                Transfer.objects.filter(Q(origin_account=account) | Q(destination_account=account)),
+                start_date=start_date,
+                end_date=end_date
+            )
+            
+            rows = transfers.order_by('created_at', 'id').values(
+                'id', 'created_at', 'completed_at', 'amount', 'status', 'description',
+                'origin_account_id', 'origin_account__number', 'destination_account__number'
+            ).iterator(chunk_size=chunk_size)
+            
+            return TransferService._export_rows(rows, account.pk)
+            
+        except Account.DoesNotExist:
+            raise BankMoreException(
+                "Conta não encontrada",
+                ErrorTypes.ACCOUNT_NOT_FOUND
+            )
+    
+    @staticmethod
+    def _export_rows(rows, account_pk):
+        status_labels = dict(TransferStatus.CHOICES)
+        
+        for row in rows:
+            sent = row['origin_account_id'] == account_pk
+            yield {
+                'id': row['id'],
+                'created_at': row['created_at'],
+                'completed_at': row['completed_at'],
+                'direction': TransferDirection.SENT if sent else TransferDirection.RECEIVED,
+                'counterparty_account_number': row['destination_account__number'] if sent else row['origin_account__number'],
+                'amount': row['amount'],
+                'status': status_labels.get(row['status'], row['status']),
+                'description': row['description'],
+            }
+    
+    @staticmethod
+    def get_transfer_detail(transfer_id: str, account_id: str) -> dict:
+        cache_key = CacheService.get_transfer_detail_key(transfer_id)
+        cached = CacheService.get(cache_key)
+        if cached is not None:
+            if str(account_id) not in cached['account_ids']:
+                raise BankMoreException(
+                    "Transferência não encontrada",
+                    ErrorTypes.INVALID_TRANSFER
+                )
+            return cached['data']
+        
+        transfer = TransferService.get_transfer_by_id(transfer_id, account_id)
+        data = dict(TransferSerializer(transfer).data)
+        
+        # completed and failed transfers never change again, so their payload can be kept for as long as we like
+        if transfer.status in (TransferStatus.COMPLETED, TransferStatus.FAILED):
+            CacheService.set(cache_key, {
+                'account_ids': [str(transfer.origin_account_id), str(transfer.destination_account_id)],
+                'data': data
+            }, timeout=settings.TRANSFER_SETTINGS['DETAIL_CACHE_TIMEOUT'])
+        
+        return data
+    
     @staticmethod
     def get_transfer_by_id(transfer_id: str, account_id: str) -> Transfer:
         try:
@@ -201,3 +666,161 @@ class TransferService:
                 "Transferência não encontrada",
                 ErrorTypes.INVALID_TRANSFER
             )
+
+
+class TransferStatsService:
+    AMOUNT_FIELDS = ['sent_amount', 'received_amount', 'fee_amount']
+    COUNT_FIELDS = ['sent_count', 'received_count', 'fee_count']
+    
+    @staticmethod
+    def record_transfers(transfers: list, batch_size: int = 500):
+        deltas = {}
+        for transfer in transfers:
+            day = timezone.localdate(transfer.completed_at)
+            TransferStatsService._add(deltas, transfer.origin_account_id, day, sent_amount=transfer.amount, sent_count=1)
+            TransferStatsService._add(deltas, transfer.destination_account_id, day, received_amount=transfer.amount, received_count=1)
+        
+        TransferStatsService._apply(deltas, batch_size)
+    
+    @staticmethod
+    def record_fees(fees: list, batch_size: int = 500):
+        deltas = {}
+        for fee in fees:
+            TransferStatsService._add(deltas, fee.account_id, timezone.localdate(fee.created_at), fee_amount=fee.amount, fee_count=1)
+        
+        TransferStatsService._apply(deltas, batch_size)
+    
+    @staticmethod
+    def _add(deltas: dict, account_id, day: date, **values):
+        row = deltas.setdefault((str(account_id), day), {})
+        for field, value in values.items():
+            row[field] = row.get(field, 0) + value
+    
+    @staticmethod
+    def _apply(deltas: dict, batch_size: int):
+        # rows are always inserted and locked in key order, so concurrent writers never wait on each other in a cycle
+        for chunk in BatchUtils.chunked(sorted(deltas.items()), batch_size):
+            with transaction.atomic():
+                # rows start empty, so every (account, day) can then be incremented in place whoever created it
+                DailyTransferStats.objects.bulk_create(
+                    [DailyTransferStats(account_id=account_id, date=day) for (account_id, day), _ in chunk],
+                    ignore_conflicts=True
+                )
+                
+                keys = {key for key, _ in chunk}
+                row_ids = {}
+                for pk, account_id, day in DailyTransferStats.objects.select_for_update().filter(
+                    account_id__in={account_id for account_id, _ in keys},
+                    date__in={day for _, day in keys}
+                ).order_by('account_id', 'date').values_list('pk', 'account_id', 'date'):
+                    if (str(account_id), day) in keys:
+                        row_ids[(str(account_id), day)] = pk
+                
+                increments = {}
+                for field in TransferStatsService.AMOUNT_FIELDS + TransferStatsService.COUNT_FIELDS:
+                    whens = [models.When(pk=row_ids[key], then=models.Value(values[field])) for key, values in chunk if field in values]
+                    if not whens:
+                        continue
+                    
+                    if field in TransferStatsService.AMOUNT_FIELDS:
+                        output_field = models.DecimalField(max_digits=15, decimal_places=2)
+                    else:
+                        output_field = models.IntegerField()
+                    increments[field] = models.F(field) + models.Case(*whens, default=models.Value(0), output_field=output_field)
+                
+                DailyTransferStats.objects.filter(pk__in=row_ids.values()).update(updated_at=timezone.now(), **increments)
+    
+    @staticmethod
+    def get_stats(account_id: str, start_date: date = None, end_date: date = None) -> dict:
+        try:
+            account = Account.objects.get(id=account_id)
+        except Account.DoesNotExist:
+            raise BankMoreException(
+                "Conta não encontrada",
+                ErrorTypes.ACCOUNT_NOT_FOUND
+            )
+        
+        end_date = end_date or timezone.localdate()
+        start_date = start_date or end_date - timedelta(days=settings.TRANSFER_SETTINGS['STATS_DEFAULT_DAYS'] - 1)
+        
+        days = list(
+            DailyTransferStats.objects.filter(
+                account=account,
+                date__gte=start_date,
+                date__lte=end_date
+            ).order_by('date').values('date', *TransferStatsService.AMOUNT_FIELDS, *TransferStatsService.COUNT_FIELDS)
+        )
+        
+        totals = {field: Decimal('0') for field in TransferStatsService.AMOUNT_FIELDS}
+        totals.update({field: 0 for field in TransferStatsService.COUNT_FIELDS})
+        for day in days:
+            for field in totals:
+                totals[field] += day[field]
+        
+        return {
+            'account_number': account.number,
+            'start_date': start_date,
+            'end_date': end_date,
+            'totals': totals,
+            'days': days
+        }
+    
+    @staticmethod
+    def first_activity_date():
+        first_transfer = Transfer.objects.filter(status=TransferStatus.COMPLETED).aggregate(first=models.Min('completed_at'))['first']
+        first_fee = Fee.objects.aggregate(first=models.Min('created_at'))['first']
+        
+        firsts = [timezone.localdate(value) for value in (first_transfer, first_fee) if value is not None]
+        return min(firsts) if firsts else None
+    
+    @staticmethod
+    def backfill(start_date: date, end_date: date, chunk_days: int = 7, batch_size: int = 1000) -> int:
+        written = 0
+        chunk_start = start_date
+        
+        while chunk_start <= end_date:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end_date)
+            period = (DateUtils.start_of_day(chunk_start), DateUtils.end_of_day(chunk_end))
+            
+            rows = {}
+            completed = Transfer.objects.filter(
+                status=TransferStatus.COMPLETED,
+                completed_at__gte=period[0],
+                completed_at__lt=period[1]
+            ).annotate(day=TruncDate('completed_at'))
+            
+            for account_field, amount_field, count_field in (
+                ('origin_account_id', 'sent_amount', 'sent_count'),
+                ('destination_account_id', 'received_amount', 'received_count'),
+            ):
+                totals = completed.values(account_field, 'day').annotate(
+                    total=models.Sum('amount'),
+                    count=models.Count('id')
+                ).order_by()
+                for row in totals:
+                    TransferStatsService._add(rows, row[account_field], row['day'], **{amount_field: row['total'], count_field: row['count']})
+            
+            # fee rows exist only for fees that were actually debited, the same set recorded as they are charged
+            fees = Fee.objects.filter(
+                created_at__gte=period[0],
+                created_at__lt=period[1]
+            ).annotate(day=TruncDate('created_at')).values('account_id', 'day').annotate(
+                total=models.Sum('amount'),
+                count=models.Count('id')
+            ).order_by()
+            for row in fees:
+                TransferStatsService._add(rows, row['account_id'], row['day'], fee_amount=row['total'], fee_count=row['count'])
+            
+            # the chunk is rebuilt from scratch, so running the backfill again never double counts
+            with transaction.atomic():
+                DailyTransferStats.objects.filter(date__gte=chunk_start, date__lte=chunk_end).delete()
+                DailyTransferStats.objects.bulk_create(
+                    [DailyTransferStats(account_id=account_id, date=day, **values) for (account_id, day), values in rows.items()],
+                    batch_size=batch_size
+                )
+            
+            logger.info(f"Transfer stats rebuilt from {chunk_start} to {chunk_end}: {len(rows)} rows")
+            written += len(rows)
+            chunk_start = chunk_end + timedelta(days=1)
+        
+        return written
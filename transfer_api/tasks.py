@@ -0,0 +1,39 @@
+import logging
+from django.conf import settings
+from django.db import InterfaceError, OperationalError
+from bankmore_project.celery import app
+from shared.exceptions import BankMoreException
+from .services import TransferService
+
+logger = logging.getLogger('bankmore')
+
+
+@app.task(bind=True, max_retries=5, acks_late=True)
+def execute_transfer(self, transfer_id: str):
+    try:
+        TransferService.execute_transfer(transfer_id)
+    except BankMoreException as e:
+        if self.request.retries >= self.max_retries:
+            TransferService.fail_transfer(transfer_id, e.message)
+            return
+        
+        logger.warning(f"Retrying transfer {transfer_id}: {e.message}")
+        raise self.retry(exc=e, countdown=2 ** self.request.retries)
+    except (OperationalError, InterfaceError) as e:
+        # the database may not even be reachable to mark the transfer failed; once retries run out
+        # it stays pending and the sweeper enqueues it again
+        if self.request.retries >= self.max_retries:
+            logger.error(f"Giving up on transfer {transfer_id} after database errors: {e}")
+            return
+        
+        logger.warning(f"Retrying transfer {transfer_id} after database error: {e}")
+        raise self.retry(exc=e, countdown=2 ** self.request.retries)
+
+
+@app.task
+def sweep_pending_transfers():
+    transfer_settings = settings.TRANSFER_SETTINGS
+    return TransferService.sweep_pending(
+        retry_after=transfer_settings['PENDING_RETRY_AFTER'],
+        fail_after=transfer_settings['PENDING_FAIL_AFTER']
+    )
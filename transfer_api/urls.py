@@ -3,6 +3,9 @@ from . import views
 
 urlpatterns = [
     path('', views.create_transfer, name='transfer-create'),
+    path('batch/', views.create_transfer_batch, name='transfer-batch'),
     path('list/', views.list_transfers, name='transfer-list'),
+    path('export/', views.export_transfers, name='transfer-export'),
+    path('stats/', views.transfer_stats, name='transfer-stats'),
     path('<uuid:transfer_id>/', views.get_transfer, name='transfer-detail'),
 ]
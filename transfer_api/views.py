@@ -1,17 +1,26 @@
+from django.conf import settings
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.openapi import OpenApiTypes
-from .serializers import CreateTransferSerializer, TransferSerializer, TransferResponseSerializer
-from .services import TransferService
+from .serializers import (
+    CreateTransferSerializer, TransferSerializer, TransferResponseSerializer,
+    TransferAcceptedSerializer, TransferExportQuerySerializer, CreateTransferBatchSerializer,
+    TransferBatchResultSerializer, TransferHistoryQuerySerializer, TransferHistorySerializer,
+    TransferStatsQuerySerializer, TransferStatsSerializer
+)
+from .services import TransferService, TransferStatsService
+from shared.renderers import CSVStreamRenderer, NDJSONStreamRenderer
+from shared.services import ExportService
 
 
 @extend_schema(
     request=CreateTransferSerializer,
-    responses={200: TransferResponseSerializer},
-    description="Realiza transferência entre contas",
+    responses={200: TransferResponseSerializer, 202: TransferAcceptedSerializer},
+    description="Realiza transferência entre contas (ou aceita para processamento assíncrono)",
     tags=["Transfer"]
 )
 @api_view(['POST'])
@@ -20,6 +29,15 @@ def create_transfer(request):
     serializer = CreateTransferSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     
+    if settings.TRANSFER_SETTINGS['ASYNC']:
+        result = TransferService.accept_transfer(
+            request_id=serializer.validated_data['request_id'],
+            origin_account_id=request.user.account_id,
+            destination_account_number=serializer.validated_data['destination_account_number'],
+            amount=serializer.validated_data['amount']
+        )
+        return Response(result, status=status.HTTP_202_ACCEPTED)
+    
     result = TransferService.create_transfer(
         request_id=serializer.validated_data['request_id'],
         origin_account_id=request.user.account_id,
@@ -31,16 +49,110 @@ def create_transfer(request):
 
 
 @extend_schema(
-    responses={200: TransferSerializer(many=True)},
-    description="Lista as transferências da conta",
+    request=CreateTransferBatchSerializer,
+    responses={200: TransferBatchResultSerializer},
+    description="Realiza um lote de transferências (ex.: folha de pagamento) a partir da conta logada",
+    tags=["Transfer"]
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def create_transfer_batch(request):
+    serializer = CreateTransferBatchSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    
+    result = TransferService.create_transfers_batch(
+        entries=serializer.validated_data['transfers'],
+        origin_account_id=request.user.account_id
+    )
+    
+    return Response(TransferBatchResultSerializer(result).data, status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter(name='direction', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, description='Direção (SENT ou RECEIVED)'),
+        OpenApiParameter(name='status', type=OpenApiTypes.INT, location=OpenApiParameter.QUERY, description='Status (0 pendente, 1 concluída, 2 falhou)'),
+        OpenApiParameter(name='start_date', type=OpenApiTypes.DATE, location=OpenApiParameter.QUERY, description='Data inicial'),
+        OpenApiParameter(name='end_date', type=OpenApiTypes.DATE, location=OpenApiParameter.QUERY, description='Data final'),
+        OpenApiParameter(name='cursor', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, description='Cursor da próxima página'),
+        OpenApiParameter(name='page_size', type=OpenApiTypes.INT, location=OpenApiParameter.QUERY, description='Itens por página'),
+    ],
+    responses={200: TransferHistorySerializer},
+    description="Lista as transferências da conta com filtros e paginação por cursor",
     tags=["Transfer"]
 )
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def list_transfers(request):
-    transfers = TransferService.get_transfers_by_account(request.user.account_id)
-    serializer = TransferSerializer(transfers, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    serializer = TransferHistoryQuerySerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    
+    result = TransferService.get_transfer_history(
+        account_id=request.user.account_id,
+        page_size=serializer.validated_data['page_size'],
+        cursor=serializer.validated_data.get('cursor'),
+        direction=serializer.validated_data.get('direction'),
+        transfer_status=serializer.validated_data.get('status'),
+        start_date=serializer.validated_data.get('start_date'),
+        end_date=serializer.validated_data.get('end_date')
+    )
+    
+    return Response(TransferHistorySerializer(result).data, status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter(name='format', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, description='Formato do arquivo (csv ou ndjson)'),
+        OpenApiParameter(name='start_date', type=OpenApiTypes.DATE, location=OpenApiParameter.QUERY, description='Data inicial'),
+        OpenApiParameter(name='end_date', type=OpenApiTypes.DATE, location=OpenApiParameter.QUERY, description='Data final'),
+    ],
+    responses={200: OpenApiTypes.BINARY},
+    description="Exporta as transferências da conta em CSV ou NDJSON",
+    tags=["Transfer"]
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([JSONRenderer, CSVStreamRenderer, NDJSONStreamRenderer])
+def export_transfers(request):
+    serializer = TransferExportQuerySerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    
+    rows = TransferService.export_transfers(
+        account_id=request.user.account_id,
+        start_date=serializer.validated_data.get('start_date'),
+        end_date=serializer.validated_data.get('end_date')
+    )
+    
+    return ExportService.stream(
+        rows,
+        ['id', 'created_at', 'completed_at', 'direction', 'counterparty_account_number', 'amount', 'status', 'description'],
+        request.accepted_renderer.format,
+        f"transferencias-{request.user.account_number}"
+    )
+
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter(name='start_date', type=OpenApiTypes.DATE, location=OpenApiParameter.QUERY, description='Data inicial'),
+        OpenApiParameter(name='end_date', type=OpenApiTypes.DATE, location=OpenApiParameter.QUERY, description='Data final'),
+    ],
+    responses={200: TransferStatsSerializer},
+    description="Totais diários de transferências enviadas, recebidas e tarifas da conta",
+    tags=["Transfer"]
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def transfer_stats(request):
+    serializer = TransferStatsQuerySerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    
+    result = TransferStatsService.get_stats(
+        account_id=request.user.account_id,
+        start_date=serializer.validated_data.get('start_date'),
+        end_date=serializer.validated_data.get('end_date')
+    )
+    
+    return Response(TransferStatsSerializer(result).data, status=status.HTTP_200_OK)
 
 
 @extend_schema(
@@ -59,6 +171,5 @@ def list_transfers(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_transfer(request, transfer_id):
-    transfer = TransferService.get_transfer_by_id(transfer_id, request.user.account_id)
-    serializer = TransferSerializer(transfer)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    data = TransferService.get_transfer_detail(transfer_id, request.user.account_id)
+    return Response(data, status=status.HTTP_200_OK)